@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.contrib.admin.views.main import ERROR_FLAG, PAGE_VAR
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return (('', ''),)
+
+    def choices(self, changelist):
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value() or '',
+            'params': {
+                key: value for key, value in changelist.params.items()
+                if key not in (self.parameter_name, PAGE_VAR, ERROR_FLAG)
+            },
+            'reset_query_string': changelist.get_query_string(
+                remove=(self.parameter_name,)
+            ),
+        }
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from backend.constants import (
+    TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL, TOKEN_VERSION_TTL
+)
+
+
+class TokenCache:
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.tokens = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            expires, value = self.tokens.get(key, (0, None))
+            if expires < monotonic():
+                self.tokens.pop(key, None)
+                return None
+            self.tokens.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.tokens[key] = (monotonic() + self.ttl, value)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.tokens.pop(key, None)
+
+    def delete_user(self, user_id):
+        with self.lock:
+            for key, (_, (_, token)) in list(self.tokens.items()):
+                if token.user_id == user_id:
+                    del self.tokens[key]
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+
+def get_shared_cache_key(key):
+    return f'auth_token_{key}'
+
+
+def get_version_key(key):
+    return f'auth_token_version_{key}'
+
+
+def invalidate_token(key):
+    token_cache.delete(key)
+    if settings.TOKEN_CACHE_SHARED:
+        cache.set(get_version_key(key), uuid4().hex, TOKEN_VERSION_TTL)
+        cache.delete(get_shared_cache_key(key))
+
+
+def invalidate_user_tokens(user):
+    token_cache.delete_user(user.pk)
+    if settings.TOKEN_CACHE_SHARED:
+        keys = list(Token.objects.filter(user=user).values_list(
+            'key', flat=True
+        ))
+        cache.set_many(
+            {get_version_key(key): uuid4().hex for key in keys},
+            TOKEN_VERSION_TTL
+        )
+        cache.delete_many([get_shared_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        if not settings.TOKEN_CACHE_SHARED:
+            cached = token_cache.get(key)
+            if cached is None:
+                cached = (None, super().authenticate_credentials(key)[1])
+                token_cache.set(key, cached)
+            token = deepcopy(cached[1])
+            return token.user, token
+        version_key = get_version_key(key)
+        cached = token_cache.get(key)
+        if cached is not None:
+            version = cache.get(version_key)
+        else:
+            values = cache.get_many((version_key, get_shared_cache_key(key)))
+            version = values.get(version_key)
+            cached = values.get(get_shared_cache_key(key))
+            if cached is not None:
+                token_cache.set(key, cached)
+        if version is None or cached is None or cached[0] != version:
+            if version is None:
+                cache.add(version_key, uuid4().hex, TOKEN_VERSION_TTL)
+                version = cache.get(version_key)
+            _, token = super().authenticate_credentials(key)
+            cached = (version, token)
+            token_cache.set(key, cached)
+            cache.set(get_shared_cache_key(key), cached, TOKEN_CACHE_TTL)
+        token = deepcopy(cached[1])
+        return token.user, token
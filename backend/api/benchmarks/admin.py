@@ -0,0 +1,32 @@
+from django.test import Client
+
+
+def get_benchmarks(benchmark, options):
+    benchmark.admin.is_superuser = True
+    benchmark.admin.save()
+    client = Client()
+    client.force_login(benchmark.admin)
+    recipe, tag = benchmark.recipe, benchmark.tag
+    pages = (
+        ('admin-recipes', '/admin/recipes/recipe/', {}),
+        ('admin-recipes-search', '/admin/recipes/recipe/',
+         {'q': recipe.name}),
+        ('admin-recipes-tag', '/admin/recipes/recipe/', {'tag': tag.slug}),
+        ('admin-recipes-author', '/admin/recipes/recipe/',
+         {'author': recipe.author.username}),
+        ('admin-recipes-ingredient', '/admin/recipes/recipe/',
+         {'ingredient': benchmark.ingredient.name}),
+        ('admin-recipe-change',
+         f'/admin/recipes/recipe/{recipe.id}/change/', {}),
+        ('admin-users', '/admin/users/user/', {}),
+        ('admin-favorites', '/admin/recipes/favorite/', {}),
+        ('admin-recipe-ingredients', '/admin/recipes/recipeingredient/', {}),
+        ('admin-subscriptions', '/admin/users/subscription/', {}),
+        ('admin-ingredients', '/admin/ingredients/ingredient/', {}),
+    )
+    return [
+        (name, lambda path=path, data=data: benchmark.request(
+            'get', lambda: (client, path, data)
+        ))
+        for name, path, data in pages
+    ]
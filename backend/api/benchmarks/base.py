@@ -0,0 +1,130 @@
+import base64
+import io
+
+from django.core.management.base import CommandError
+from django.test import Client
+from django.utils.text import compress_string
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from api.middleware import brotli
+from backend.constants import BROTLI_QUALITY
+from ingredients.models import Ingredient
+from recipes.models import Recipe
+from tags.models import Tag
+from users.models import User
+
+PASSWORD = 'benchmark-password'
+
+
+def get_image():
+    content = io.BytesIO()
+    Image.new('RGB', (64, 64), '#49B64E').save(content, 'PNG')
+    return (
+        'data:image/png;base64,'
+        + base64.b64encode(content.getvalue()).decode()
+    )
+
+
+def get_sizes(content):
+    sizes = [
+        f'без сжатия {len(content)}',
+        f'gzip {len(compress_string(content))}',
+    ]
+    if brotli is not None:
+        compressed = brotli.compress(content, quality=BROTLI_QUALITY)
+        sizes.append(f'brotli {len(compressed)}')
+    return ', '.join(sizes)
+
+
+def get_client(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    return Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+
+class Benchmark:
+
+    def __init__(self, email, stdout):
+        self.stdout = stdout
+        users = User.objects.order_by('id')
+        self.user = (
+            users.get(email=email) if email
+            else users.filter(favorites_user__isnull=False).first()
+            or users.first()
+        )
+        if self.user is None:
+            raise CommandError(
+                'В базе нет пользователей, выполните generatedata.'
+            )
+        self.other = users.exclude(id=self.user.id).first()
+        self.recipe = Recipe.objects.exclude(author=self.user).first()
+        self.ingredient = Ingredient.objects.first()
+        self.tag = Tag.objects.first()
+        if None in (self.other, self.recipe, self.ingredient, self.tag):
+            raise CommandError(
+                'Недостаточно данных в базе, выполните generatedata.'
+            )
+        self.counter = 0
+        self.image = get_image()
+        self.client = get_client(self.user)
+        self.anonymous = Client()
+        self.admin = User.objects.create_user(
+            is_staff=True, **self.get_user_data()
+        )
+        self.own_recipe_path = None
+
+    def fixed(self, path, setup=None):
+        def prepare():
+            if setup is not None:
+                setup()
+            return self.client, path, None
+        return prepare
+
+    def get_user_data(self):
+        self.counter += 1
+        return {
+            'email': f'benchmark_{self.counter}@example.com',
+            'username': f'benchmark_{self.counter}',
+            'first_name': 'Бенчмарк',
+            'last_name': 'Бенчмарк',
+            'password': PASSWORD,
+        }
+
+    def get_recipe_data(self):
+        self.counter += 1
+        return {
+            'name': f'Бенчмарк {self.counter}',
+            'text': 'Описание рецепта.',
+            'cooking_time': 10,
+            'image': self.image,
+            'tags': [self.tag.id],
+            'ingredients': [{'id': self.ingredient.id, 'amount': 10}],
+        }
+
+    def create_recipe(self):
+        response = self.client.post(
+            '/api/recipes/', self.get_recipe_data(),
+            content_type='application/json'
+        )
+        return f'/api/recipes/{response.json()["id"]}/'
+
+    def get_own_recipe_path(self):
+        if self.own_recipe_path is None:
+            self.own_recipe_path = self.create_recipe()
+        return self.own_recipe_path
+
+    def request(self, method, prepare):
+        client, path, data = prepare()
+
+        def run():
+            response = getattr(client, method)(
+                path, data, content_type='application/json'
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{method.upper()} {path}: {response.status_code} '
+                    f'{response.content[:200]!r}'
+                )
+        return run
@@ -0,0 +1,98 @@
+from recipes.models import Favorite, ShoppingCart
+from users.models import Subscription
+from .base import PASSWORD, get_client
+
+
+def get_benchmarks(benchmark, options):
+    recipe, other = benchmark.recipe.id, benchmark.other.id
+    subscription = {'user': benchmark.user, 'subscription': benchmark.other}
+    relation = {'user': benchmark.user, 'recipe': benchmark.recipe}
+    fixed = benchmark.fixed
+    endpoints = (
+        ('users-list', 'get', fixed('/api/users/')),
+        ('users-detail', 'get', fixed(f'/api/users/{other}/')),
+        ('users-me', 'get', fixed('/api/users/me/')),
+        ('users-subscriptions', 'get',
+         fixed('/api/users/subscriptions/?recipes_limit=3')),
+        ('users-subscribe', 'post', fixed(
+            f'/api/users/{other}/subscribe/',
+            setup=lambda: Subscription.objects.filter(
+                **subscription
+            ).delete()
+        )),
+        ('users-unsubscribe', 'delete', fixed(
+            f'/api/users/{other}/subscribe/',
+            setup=lambda: Subscription.objects.get_or_create(**subscription)
+        )),
+        ('users-create', 'post', lambda: (
+            benchmark.anonymous, '/api/users/', benchmark.get_user_data()
+        )),
+        ('users-set-password', 'post', lambda: (
+            get_client(benchmark.admin), '/api/users/set_password/',
+            {'current_password': PASSWORD, 'new_password': PASSWORD}
+        )),
+        ('auth-login', 'post', lambda: (
+            benchmark.anonymous, '/api/auth/token/login/',
+            {'email': benchmark.admin.email, 'password': PASSWORD}
+        )),
+        ('auth-logout', 'post', lambda: (
+            get_client(benchmark.admin), '/api/auth/token/logout/', None
+        )),
+        ('ingredients-list', 'get', fixed('/api/ingredients/')),
+        ('ingredients-search', 'get', fixed('/api/ingredients/?name=мо')),
+        ('ingredients-detail', 'get',
+         fixed(f'/api/ingredients/{benchmark.ingredient.id}/')),
+        ('tags-list', 'get', fixed('/api/tags/')),
+        ('tags-detail', 'get', fixed(f'/api/tags/{benchmark.tag.id}/')),
+        ('recipes-list-anonymous', 'get', lambda: (
+            benchmark.anonymous, '/api/recipes/', None
+        )),
+        ('recipes-list', 'get', fixed('/api/recipes/')),
+        ('recipes-list-limit', 'get', fixed('/api/recipes/?limit=20')),
+        ('recipes-list-tags', 'get',
+         fixed(f'/api/recipes/?tags={benchmark.tag.slug}')),
+        ('recipes-list-author', 'get',
+         fixed(f'/api/recipes/?author={benchmark.recipe.author_id}')),
+        ('recipes-list-favorited', 'get',
+         fixed('/api/recipes/?is_favorited=1')),
+        ('recipes-list-in-cart', 'get',
+         fixed('/api/recipes/?is_in_shopping_cart=1')),
+        ('recipes-detail', 'get', fixed(f'/api/recipes/{recipe}/')),
+        ('recipes-create', 'post', lambda: (
+            benchmark.client, '/api/recipes/', benchmark.get_recipe_data()
+        )),
+        ('recipes-update', 'patch', lambda: (
+            benchmark.client, benchmark.get_own_recipe_path(),
+            benchmark.get_recipe_data()
+        )),
+        ('recipes-delete', 'delete', lambda: (
+            benchmark.client, benchmark.create_recipe(), None
+        )),
+        ('recipes-favorite', 'post', fixed(
+            f'/api/recipes/{recipe}/favorite/',
+            setup=lambda: Favorite.objects.filter(**relation).delete()
+        )),
+        ('recipes-unfavorite', 'delete', fixed(
+            f'/api/recipes/{recipe}/favorite/',
+            setup=lambda: Favorite.objects.get_or_create(**relation)
+        )),
+        ('recipes-add-to-cart', 'post', fixed(
+            f'/api/recipes/{recipe}/shopping_cart/',
+            setup=lambda: ShoppingCart.objects.filter(**relation).delete()
+        )),
+        ('recipes-remove-from-cart', 'delete', fixed(
+            f'/api/recipes/{recipe}/shopping_cart/',
+            setup=lambda: ShoppingCart.objects.get_or_create(**relation)
+        )),
+        ('recipes-download-shopping-cart', 'get',
+         fixed('/api/recipes/download_shopping_cart/')),
+        ('metrics', 'get', lambda: (
+            get_client(benchmark.admin), '/api/metrics/', None
+        )),
+    )
+    return [
+        (name, lambda method=method, prepare=prepare: benchmark.request(
+            method, prepare
+        ))
+        for name, method, prepare in endpoints
+    ]
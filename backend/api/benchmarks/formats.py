@@ -0,0 +1,55 @@
+import json
+
+import msgpack
+from django.core.management.base import CommandError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.functions import to_columns
+from api.renderers import FastJSONRenderer, MessagePackRenderer
+from api.serializers import IngredientSerializer, RecipeDisplaySerializer
+from backend.constants import PAGE_SIZE
+from ingredients.models import Ingredient
+from recipes.models import Recipe
+from .base import get_sizes
+
+
+def get_benchmarks(benchmark, options):
+    request = Request(APIRequestFactory().get('/api/recipes/'))
+    request.user = benchmark.user
+    catalog = {
+        'ingredients': IngredientSerializer(
+            Ingredient.objects.all(), many=True
+        ).data,
+        'recipes': RecipeDisplaySerializer(
+            Recipe.objects.order_by('-pub_date', 'name')[:PAGE_SIZE],
+            many=True,
+            context={'request': request}
+        ).data,
+    }
+    renderers = {
+        'json': FastJSONRenderer(),
+        'msgpack': MessagePackRenderer(),
+    }
+    benchmarks = []
+    for name, rows in catalog.items():
+        layouts = {'rows': rows, 'columnar': to_columns(rows)}
+        if msgpack.unpackb(
+            renderers['msgpack'].render(rows)
+        ) != json.loads(renderers['json'].render(rows)):
+            raise CommandError(
+                f'Ответ MessagePackRenderer для {name} отличается от JSON.'
+            )
+        for layout, data in layouts.items():
+            for format, renderer in renderers.items():
+                benchmark.stdout.write(
+                    f'{name}-{layout}-{format}, размер в байтах: '
+                    f'{get_sizes(renderer.render(data))}.'
+                )
+                benchmarks.append((
+                    f'{name}-{layout}-{format}',
+                    lambda renderer=renderer, data=data: (
+                        lambda: renderer.render(data)
+                    )
+                ))
+    return benchmarks
@@ -0,0 +1,59 @@
+from django.core.management.base import CommandError
+from django.db import models
+
+from backend.constants import (
+    INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_ANY, INGREDIENTS_MATCH_BEST,
+    PAGE_SIZE
+)
+from recipes.ingredient_index import filter_by_ingredients
+from recipes.models import Recipe, RecipeIngredient
+
+
+def get_benchmarks(benchmark, options):
+    ingredient_ids = list(RecipeIngredient.objects.filter(
+        recipe=benchmark.recipe, ingredient__isnull=False
+    ).values_list('ingredient', flat=True)[:options['ingredients']])
+    recipes = Recipe.objects.order_by('-pub_date', 'name')
+
+    def joined(match):
+        queryset = recipes.filter(
+            recipe_ingredient__ingredient__in=ingredient_ids
+        ).annotate(coverage=models.Count('recipe_ingredient'))
+        if match == INGREDIENTS_MATCH_ALL:
+            return queryset.filter(coverage=len(set(ingredient_ids)))
+        if match == INGREDIENTS_MATCH_BEST:
+            return queryset.order_by('-coverage', '-pub_date', 'name')
+        return queryset
+
+    def indexed(match):
+        return filter_by_ingredients(recipes, ingredient_ids, match)
+
+    def page(get_queryset, match):
+        def run():
+            queryset = get_queryset(match)
+            return queryset.count(), list(
+                queryset.values_list('id', flat=True)[:PAGE_SIZE]
+            )
+        return run
+
+    benchmarks = []
+    for match in (
+        INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_ANY, INGREDIENTS_MATCH_BEST
+    ):
+        found = list(joined(match).values_list('id', flat=True))
+        if found != list(indexed(match).values_list('id', flat=True)):
+            raise CommandError(
+                f'Поиск по индексу (match={match}) отличается '
+                'от поиска по RecipeIngredient.'
+            )
+        benchmark.stdout.write(
+            f'match={match}: найдено рецептов {len(found)} '
+            f'из {recipes.count()}.'
+        )
+        benchmarks.extend((
+            (f'ingredients-{match}-join',
+             lambda match=match: page(joined, match)),
+            (f'ingredients-{match}-index',
+             lambda match=match: page(indexed, match)),
+        ))
+    return benchmarks
@@ -0,0 +1,27 @@
+from django.core.management.base import CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from api.serializers import IngredientSerializer
+from ingredients.models import Ingredient
+from .base import get_sizes
+
+
+def get_benchmarks(benchmark, options):
+    data = IngredientSerializer(Ingredient.objects.all(), many=True).data
+    renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    content = renderer.render(data)
+    if content != fast_renderer.render(data):
+        raise CommandError(
+            'Ответ FastJSONRenderer отличается от JSONRenderer.'
+        )
+    benchmark.stdout.write(
+        f'Ответ /api/ingredients/ совпадает побайтно, размер в байтах: '
+        f'{get_sizes(content)}.'
+    )
+    return [
+        ('ingredients-json-renderer',
+         lambda: lambda: renderer.render(data)),
+        ('ingredients-fast-json-renderer',
+         lambda: lambda: fast_renderer.render(data)),
+    ]
@@ -0,0 +1,40 @@
+from django.core.management.base import CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import RecipeDisplaySerializer
+from recipes.models import Recipe
+
+
+def get_benchmarks(benchmark, options):
+    recipes = list(Recipe.objects.all()[:options['recipes']])
+    request = Request(APIRequestFactory().get('/api/recipes/'))
+    request.user = benchmark.user
+    context = {'request': request}
+
+    def generic():
+        return [
+            RecipeDisplaySerializer(recipe, context=context).data
+            for recipe in recipes
+        ]
+
+    def fast():
+        return RecipeDisplaySerializer(
+            recipes, many=True, context=context
+        ).data
+
+    renderer = JSONRenderer()
+    if renderer.render(generic()) != renderer.render(fast()):
+        raise CommandError(
+            'Представление списка рецептов (RecipeDisplayListSerializer) '
+            'отличается от представления рецептов по одному '
+            '(RecipeDisplaySerializer).'
+        )
+    benchmark.stdout.write(
+        f'Представления {len(recipes)} рецептов совпадают побайтно.'
+    )
+    return [
+        ('recipes-serializer', lambda: generic),
+        ('recipes-list-serializer', lambda: fast),
+    ]
@@ -0,0 +1,40 @@
+from django.db import models
+
+from recipes.models import Recipe, RecipeIngredient, ShoppingCart
+from recipes.shopping_list import get_shopping_list, render_shopping_list
+
+
+def get_benchmarks(benchmark, options):
+    user = benchmark.user
+    ShoppingCart.objects.filter(user=user).delete()
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=user, recipe=recipe)
+        for recipe in Recipe.objects.all()[:options['recipes']]
+    )
+    cart = ShoppingCart.objects.filter(user=user)
+    ingredients = RecipeIngredient.objects.filter(
+        recipe__in=cart.values_list('recipe')
+    )
+
+    def by_ingredient():
+        return list(ingredients.values('ingredient').annotate(
+            total_amount=models.Sum('amount')
+        ).values_list(
+            'ingredient__name',
+            'total_amount',
+            'ingredient__measurement_unit'
+        ).order_by('ingredient__name'))
+
+    def by_unit():
+        return render_shopping_list(get_shopping_list(user.id))
+
+    benchmark.stdout.write(
+        f'В корзине {cart.count()} рецептов, '
+        f'{ingredients.count()} ингредиентов, строк в списке: '
+        f'{len(by_ingredient())} по ингредиентам, '
+        f'{len(get_shopping_list(user.id))} по единицам измерения.'
+    )
+    return [
+        ('shopping-list-by-ingredient', lambda: by_ingredient),
+        ('shopping-list-by-unit', lambda: by_unit),
+    ]
@@ -0,0 +1,56 @@
+import base64
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+
+def get_benchmarks(benchmark, options):
+    content = io.BytesIO()
+    Image.effect_noise(
+        (options['image_size'], options['image_size']), 64
+    ).convert('RGB').save(content, 'PNG')
+    image = content.getvalue()
+    encoded_image = (
+        'data:image/png;base64,' + base64.b64encode(image).decode()
+    )
+    multipart = encode_multipart(
+        BOUNDARY, {'image': SimpleUploadedFile('image.png', image)}
+    )
+    benchmark.stdout.write(
+        f'Размер картинки в байтах: {len(image)}, '
+        f'в base64: {len(encoded_image)}.'
+    )
+
+    def post(path, body, content_type):
+        def run():
+            response = benchmark.client.generic(
+                'POST', path, body, content_type
+            )
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'POST {path}: {response.status_code} '
+                    f'{response.content[:200]!r}'
+                )
+            return response
+        return run
+
+    upload = post('/api/recipes/images/', multipart, MULTIPART_CONTENT)
+    token = upload().json()['token']
+
+    def recipe(**image):
+        data = benchmark.get_recipe_data()
+        data.pop('image')
+        return post(
+            '/api/recipes/', json.dumps(dict(data, **image)),
+            'application/json'
+        )
+
+    return [
+        ('recipe-base64-image', lambda: recipe(image=encoded_image)),
+        ('image-upload', lambda: upload),
+        ('recipe-image-token', lambda: recipe(image_token=token)),
+    ]
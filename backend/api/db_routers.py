@@ -0,0 +1,44 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from backend.constants import REPLICA_PIN_SECONDS
+
+use_replica = ContextVar('use_replica', default=False)
+
+
+def get_replica_pin_key(user):
+    return f'replica_pin_{user.id}'
+
+
+def pin_to_primary(user):
+    if user.is_authenticated:
+        cache.set(get_replica_pin_key(user), True, REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and cache.get(get_replica_pin_key(user))
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            use_replica.get()
+            and settings.REPLICA_DATABASES
+            and not connections['default'].in_atomic_block
+        ):
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
@@ -1,7 +1,13 @@
+from django import forms
 from django_filters import CharFilter, filters, FilterSet
 
+from backend.constants import (
+    INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_ANY, INGREDIENTS_MATCH_BEST
+)
 from ingredients.models import Ingredient
+from recipes.ingredient_index import filter_by_ingredients
 from recipes.models import Favorite, Recipe, ShoppingCart
+from tags.models import Tag
 from .functions import get_many_to_many_list
 
 
@@ -13,8 +19,33 @@ class IngredientFilter(FilterSet):
         fields = ('name',)
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+class MultipleValueField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        return [item for item in value or () if item]
+
+
+class MultipleValueFilter(filters.Filter):
+    field_class = MultipleValueField
+
+
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    search = filters.CharFilter(method='filter_search')
+    ingredients = NumberInFilter(method='filter_ingredients')
+    match = filters.ChoiceFilter(
+        choices=(
+            (INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_ALL),
+            (INGREDIENTS_MATCH_ANY, INGREDIENTS_MATCH_ANY),
+            (INGREDIENTS_MATCH_BEST, INGREDIENTS_MATCH_BEST),
+        ),
+        method='filter_match'
+    )
+    tags = MultipleValueFilter(method='filter_tags')
     is_favorited = filters.Filter(
         field_name='favorites', method='filter_is_favorited'
     )
@@ -24,7 +55,31 @@ class RecipeFilter(FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart',)
+        fields = (
+            'author', 'tags', 'is_favorited', 'is_in_shopping_cart', 'search',
+            'ingredients', 'match',
+        )
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+    def filter_tags(self, queryset, name, value):
+        mask = 0
+        for tag in Tag.objects.filter(slug__in=value).only('bit'):
+            mask |= tag.mask
+        return queryset.with_any_tag(mask)
+
+    def filter_ingredients(self, queryset, name, value):
+        if not value:
+            return queryset
+        return filter_by_ingredients(
+            queryset,
+            map(int, value),
+            self.form.cleaned_data.get('match') or INGREDIENTS_MATCH_ALL
+        )
+
+    def filter_match(self, queryset, name, value):
+        return queryset
 
     def filter_is_favorited(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
@@ -1,10 +1,18 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Exists, F, OuterRef
 from django.forms.models import model_to_dict
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
+from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import (
     LimitOffsetPagination, PageNumberPagination
 )
 
+from backend.constants import (
+    AUTHOR_ORDERING, RECIPE_FIELDS, RECIPE_RELATIONS
+)
 from backend.settings import PAGE_SIZE
 from recipes.models import Favorite, Recipe, ShoppingCart
 from users.models import Subscription, User
@@ -28,6 +36,14 @@ ERRORS_NOT_EXISTS_DICT = {
 }
 
 
+BULK_ADDED = 'added'
+BULK_REMOVED = 'removed'
+BULK_ALREADY_ADDED = 'already_added'
+BULK_NOT_ADDED = 'not_added'
+BULK_NOT_FOUND = 'not_found'
+BULK_SELF = 'self'
+
+
 def get_many_to_many_instance(request, pk, model):
     user = request.user
     obj = get_object_or_404(MODELS_DEPENDENCY_DICT[model], pk=pk)
@@ -39,6 +55,15 @@ def get_many_to_many_instance(request, pk, model):
     return instance
 
 
+def delete_many_to_many_instance(request, pk, model):
+    deleted, _ = model.objects.filter(
+        **{'user': request.user, f'{MODELS_FIELDS_DICT[model]}_id': pk}
+    ).delete()
+    if not deleted:
+        get_object_or_404(MODELS_DEPENDENCY_DICT[model], pk=pk)
+        raise ValidationError(ERRORS_NOT_EXISTS_DICT[model])
+
+
 def get_many_to_many_list(request, model):
     return [
         model_to_dict(obj)[
@@ -47,8 +72,106 @@ def get_many_to_many_list(request, model):
     ]
 
 
+def get_many_to_many_statuses(request, ids, model):
+    return dict(
+        MODELS_DEPENDENCY_DICT[model].objects.filter(id__in=ids).annotate(
+            is_added=Exists(model.objects.filter(
+                user=request.user,
+                **{MODELS_FIELDS_DICT[model]: OuterRef('pk')}
+            ))
+        ).values_list('id', 'is_added')
+    )
+
+
+def bulk_add_many_to_many(request, ids, model):
+    statuses = get_many_to_many_statuses(request, ids, model)
+    results, instances = [], []
+    for pk in ids:
+        if pk not in statuses:
+            status = BULK_NOT_FOUND
+        elif model is Subscription and pk == request.user.id:
+            status = BULK_SELF
+        elif statuses[pk]:
+            status = BULK_ALREADY_ADDED
+        else:
+            status = BULK_ADDED
+            instances.append(model(
+                user=request.user, **{f'{MODELS_FIELDS_DICT[model]}_id': pk}
+            ))
+        results.append({'id': pk, 'status': status})
+    model.objects.bulk_create(instances, ignore_conflicts=True)
+    return results
+
+
+def bulk_delete_many_to_many(request, ids, model):
+    statuses = get_many_to_many_statuses(request, ids, model)
+    model.objects.filter(
+        user=request.user, **{f'{MODELS_FIELDS_DICT[model]}__in': ids}
+    ).delete()
+    return [
+        {
+            'id': pk,
+            'status': (
+                BULK_NOT_FOUND if pk not in statuses
+                else BULK_REMOVED if statuses[pk]
+                else BULK_NOT_ADDED
+            )
+        } for pk in ids
+    ]
+
+
+def get_sparse_fieldsets(request):
+    fieldsets = {}
+    for param, choices in (
+        ('fields', RECIPE_FIELDS), ('expand', RECIPE_RELATIONS)
+    ):
+        value = request.query_params.get(param)
+        if value is None:
+            continue
+        names = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise ValidationError(
+                {param: [f'Неизвестные поля: {", ".join(unknown)}.']}
+            )
+        fieldsets[param] = names
+    return fieldsets
+
+
+def get_author_ordering(request, prefix=''):
+    ordering = request.query_params.get('ordering')
+    if ordering is None:
+        return None
+    ordering = serializers.ChoiceField(AUTHOR_ORDERING).run_validation(
+        ordering
+    )
+    field = F(prefix + ordering.lstrip('-'))
+    if ordering.startswith('-'):
+        return field.desc(nulls_last=True), f'{prefix}id'
+    return field.asc(nulls_last=True), f'{prefix}id'
+
+
+def to_columns(rows, names=()):
+    if rows:
+        names = rows[0]
+    return {name: [row[name] for row in rows] for name in names}
+
+
 def get_pagination_class(self):
     limit = self.request.query_params.get('limit')
     if limit and (limit != str(PAGE_SIZE)):
         return LimitOffsetPagination
     return PageNumberPagination
+
+
+def get_file_response(name, filename):
+    if not settings.SENDFILE_X_ACCEL:
+        return FileResponse(
+            default_storage.open(name), as_attachment=True, filename=filename
+        )
+    response = HttpResponse(content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Redirect'] = default_storage.url(name)
+    return response
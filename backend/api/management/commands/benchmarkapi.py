@@ -0,0 +1,187 @@
+import json
+import math
+import tracemalloc
+from contextlib import ExitStack
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test.utils import override_settings
+
+from api.benchmarks import (
+    admin, endpoints, formats, ingredients, renderers, serializers, shopping,
+    uploads
+)
+from api.benchmarks.base import Benchmark
+from api.middleware import QueryCounter
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_RECIPES = 1000
+DEFAULT_SEARCH_INGREDIENTS = 3
+DEFAULT_IMAGE_SIZE = 1500
+SUITES = {
+    'endpoints': endpoints.get_benchmarks,
+    'serializers': serializers.get_benchmarks,
+    'renderers': renderers.get_benchmarks,
+    'formats': formats.get_benchmarks,
+    'ingredients': ingredients.get_benchmarks,
+    'shopping': shopping.get_benchmarks,
+    'admin': admin.get_benchmarks,
+    'uploads': uploads.get_benchmarks,
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все эндпоинты API через тестовый клиент и выводит '
+        'p50/p95 задержки, количество SQL-запросов и пик выделенной памяти. '
+        'Все изменения в базе данных откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--suite', choices=tuple(SUITES), default='endpoints',
+            help=(
+                'Эндпоинты API, сериализаторы рецептов, JSON-рендереры, '
+                'форматы ответа, поиск по ингредиентам, список покупок, '
+                'страницы админки или загрузку картинок.'
+            )
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=DEFAULT_ITERATIONS
+        )
+        parser.add_argument(
+            '--recipes', type=int, default=DEFAULT_RECIPES,
+            help=(
+                'Количество рецептов для сравнения сериализаторов '
+                'и в корзине покупок.'
+            )
+        )
+        parser.add_argument(
+            '--ingredients', type=int, default=DEFAULT_SEARCH_INGREDIENTS,
+            help='Количество ингредиентов в поиске по ингредиентам.'
+        )
+        parser.add_argument(
+            '--image-size', type=int, default=DEFAULT_IMAGE_SIZE,
+            help='Сторона картинки в пикселях для загрузки картинок.'
+        )
+        parser.add_argument(
+            '--endpoints', nargs='*',
+            help='Имена эндпоинтов, которые нужно измерить.'
+        )
+        parser.add_argument(
+            '--user',
+            help='Email пользователя, от имени которого идут запросы.'
+        )
+        parser.add_argument('--json', help='Файл для сохранения результатов.')
+        parser.add_argument(
+            '--baseline', help='Файл с результатами для сравнения.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+            help='Допустимый относительный рост p95.'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(override_settings(
+                    MEDIA_ROOT=stack.enter_context(TemporaryDirectory())
+                ))
+                stack.enter_context(transaction.atomic())
+                benchmark = Benchmark(options['user'], self.stdout)
+                benchmarks = SUITES[options['suite']](benchmark, options)
+                for name, prepare in benchmarks:
+                    if (
+                        options['endpoints']
+                        and name not in options['endpoints']
+                    ):
+                        continue
+                    results[name] = self.measure(
+                        prepare, options['iterations']
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.print_results(results)
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def timed(self, run):
+        counter = QueryCounter()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            run()
+        return perf_counter() - start, counter.count
+
+    def measure(self, prepare, iterations):
+        self.timed(prepare())
+        durations, queries = [], []
+        for _ in range(iterations):
+            duration, count = self.timed(prepare())
+            durations.append(duration * 1000)
+            queries.append(count)
+        tracemalloc.start()
+        try:
+            self.timed(prepare())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'p50_ms': round(percentile(durations, 50), 2),
+            'p95_ms': round(percentile(durations, 95), 2),
+            'queries': max(queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"эндпоинт":<32}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"SQL":>6}{"память, КиБ":>14}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<32}{result["p50_ms"]:>10}{result["p95_ms"]:>10}'
+                f'{result["queries"]:>6}{result["peak_kib"]:>14}'
+            )
+
+    def compare(self, results, baseline_file, tolerance):
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            if result['queries'] > baseline[name]['queries']:
+                regressions.append(
+                    f'{name}: SQL-запросов {baseline[name]["queries"]} '
+                    f'-> {result["queries"]}'
+                )
+            if result['p95_ms'] > baseline[name]['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {baseline[name]["p95_ms"]} '
+                    f'-> {result["p95_ms"]} мс'
+                )
+        if regressions:
+            raise CommandError(
+                'Обнаружены регрессии:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
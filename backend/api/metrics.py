@@ -0,0 +1,40 @@
+from collections import defaultdict
+from threading import Lock
+
+METRICS_DESCRIPTIONS = {
+    'requests_total': ('counter', 'Количество обработанных запросов.'),
+    'db_queries_total': ('counter', 'Количество SQL-запросов.'),
+    'db_seconds_total': ('counter', 'Суммарное время SQL-запросов.'),
+    'app_seconds_total': (
+        'counter', 'Время работы представления без учета SQL-запросов.'
+    ),
+    'request_seconds_total': ('counter', 'Суммарное время обработки.'),
+    'response_bytes_total': ('counter', 'Суммарный размер ответов.'),
+    'query_budget_exceeded_total': (
+        'counter', 'Количество запросов, превысивших бюджет SQL-запросов.'
+    ),
+}
+
+metrics = defaultdict(lambda: defaultdict(float))
+metrics_lock = Lock()
+
+
+def record_metrics(action, values):
+    with metrics_lock:
+        for name, value in values.items():
+            metrics[action][name] += value
+
+
+def render_metrics():
+    with metrics_lock:
+        snapshot = {
+            action: dict(values) for action, values in metrics.items()
+        }
+    lines = []
+    for name, (metric_type, description) in METRICS_DESCRIPTIONS.items():
+        lines.append(f'# HELP foodgram_{name} {description}')
+        lines.append(f'# TYPE foodgram_{name} {metric_type}')
+        for action in sorted(snapshot):
+            value = snapshot[action].get(name, 0)
+            lines.append(f'foodgram_{name}{{action="{action}"}} {value!r}')
+    return '\n'.join(lines) + '\n'
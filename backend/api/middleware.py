@@ -0,0 +1,158 @@
+import logging
+import re
+from contextlib import ExitStack
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+from backend.constants import (
+    BROTLI_QUALITY, COMPRESSIBLE_CONTENT_TYPES, COMPRESSION_MIN_LENGTH,
+    COMPRESSION_PATH_PREFIX
+)
+from .metrics import record_metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+
+
+def get_action_name(request, view_func):
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return None
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+class QueryMetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_counter = QueryCounter()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(request.query_counter)
+                )
+            response = self.get_response(request)
+        end = perf_counter()
+        action = getattr(request, 'metrics_action', None)
+        if action is None:
+            return response
+
+        counter = request.query_counter
+        view_end, view_sql_end = getattr(
+            request, 'metrics_view_end', (end, counter.duration)
+        )
+        app_time = max(
+            (view_end - request.metrics_view_start)
+            - (view_sql_end - request.metrics_view_sql_start),
+            0.0
+        )
+        if response.streaming:
+            response_size = int(response.get('Content-Length', 0))
+        else:
+            response_size = len(response.content)
+        budget = settings.QUERY_BUDGETS.get(action, settings.QUERY_BUDGET)
+        over_budget = bool(budget) and counter.count > budget
+        if over_budget:
+            logger.warning(
+                '%s выполнил %s SQL-запросов при бюджете %s.',
+                action, counter.count, budget
+            )
+        record_metrics(action, {
+            'requests_total': 1,
+            'db_queries_total': counter.count,
+            'db_seconds_total': counter.duration,
+            'app_seconds_total': app_time,
+            'request_seconds_total': end - start,
+            'response_bytes_total': response_size,
+            'query_budget_exceeded_total': int(over_budget),
+        })
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={counter.duration * 1000:.1f};'
+            f'desc="{counter.count} queries"',
+            f'app;dur={app_time * 1000:.1f}',
+            f'total;dur={(end - start) * 1000:.1f}',
+        ))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_action = get_action_name(request, view_func)
+        request.metrics_view_start = perf_counter()
+        request.metrics_view_sql_start = request.query_counter.duration
+
+    def process_template_response(self, request, response):
+        request.metrics_view_end = (
+            perf_counter(), request.query_counter.duration
+        )
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not request.path.startswith(COMPRESSION_PATH_PREFIX)
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_CONTENT_TYPES
+            )
+            or len(response.content) < COMPRESSION_MIN_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_brotli.search(accept_encoding):
+            encoding = 'br'
+            compress = partial(brotli.compress, quality=BROTLI_QUALITY)
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding = 'gzip'
+            compress = compress_string
+        else:
+            return response
+
+        content = compress(response.content)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
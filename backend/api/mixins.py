@@ -1,7 +1,85 @@
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, serializers, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from backend.constants import LAYOUT_COLUMNAR, LAYOUT_ROWS
+from .db_routers import is_pinned_to_primary, pin_to_primary, use_replica
+from .functions import (
+    bulk_add_many_to_many, bulk_delete_many_to_many, to_columns
+)
+from .serializers import BulkSerializer
 
 
 class ListRetrieveViewSet(
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     pass
+
+
+class ReplicaReadMixin:
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        use_replica.set(
+            request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request.user)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        use_replica.set(False)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class BulkManyToManyMixin:
+
+    def get_bulk_ids(self, request):
+        serializer = BulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['ids']
+
+    def bulk_add(self, request, model):
+        return Response(bulk_add_many_to_many(
+            request, self.get_bulk_ids(request), model
+        ))
+
+    def bulk_delete(self, request, model):
+        return Response(bulk_delete_many_to_many(
+            request, self.get_bulk_ids(request), model
+        ))
+
+
+class ColumnarListMixin:
+
+    def get_layout(self):
+        return serializers.ChoiceField(
+            (LAYOUT_ROWS, LAYOUT_COLUMNAR)
+        ).run_validation(
+            self.request.query_params.get('layout', LAYOUT_ROWS)
+        )
+
+    def to_layout(self, rows, layout):
+        if layout != LAYOUT_COLUMNAR:
+            return rows
+        if rows:
+            return to_columns(rows)
+        serializer = self.get_serializer()
+        return to_columns(rows, serializer.context.get('fields') or [
+            name for name, field in serializer.fields.items()
+            if not field.write_only
+        ])
+
+    def list(self, request, *args, **kwargs):
+        layout = self.get_layout()
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, dict):
+            response.data['results'] = self.to_layout(
+                response.data['results'], layout
+            )
+        else:
+            response.data = self.to_layout(response.data, layout)
+        return response
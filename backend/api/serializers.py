@@ -1,18 +1,42 @@
+from collections import defaultdict
+from copy import copy
+from datetime import timedelta
+
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, models, transaction
 from djoser.serializers import UserCreateSerializer
+from django.utils import timezone
 from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
 from backend.constants import (
+    IMAGE_FORMATS,
+    IMAGE_UPLOAD_TTL,
+    MAX_BULK_ITEMS,
+    MAX_IMAGE_SIDE,
+    MAX_IMAGE_UPLOAD_SIZE,
     MAX_INGREDIENT_AMOUNT,
-    MIN_INGREDIENT_AMOUNT
+    MIN_INGREDIENT_AMOUNT,
+    MIN_SERVINGS,
+    RECIPE_FIELDS,
+    RECIPE_RELATIONS
 )
 from backend.settings import MEDIA_URL
 from ingredients.models import Ingredient
+from jobs.models import Job
+from recipes.deletion import delete_unused_images
 from recipes.models import (
-    Favorite, Recipe, RecipeIngredient, RecipeTag, ShoppingCart
+    Favorite,
+    ImageUpload,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    ShoppingCart
 )
+from recipes.tasks import update_ingredient_index
 from tags.models import Tag
 from users.models import Subscription, User
 
@@ -47,24 +71,46 @@ class UserDisplaySerializer(serializers.ModelSerializer):
         )
 
 
-class SubscribeSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(UserDisplaySerializer):
+
+    class Meta(UserDisplaySerializer.Meta):
+        fields = UserDisplaySerializer.Meta.fields + (
+            'recipes_count', 'last_recipe_at',
+        )
+
+
+class UniqueCreateSerializer(serializers.ModelSerializer):
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    unique_error_message = None
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [self.unique_error_message]
+            })
+
+
+class SubscribeSerializer(UniqueCreateSerializer):
+    unique_error_message = (
+        'Нельзя повторно подписываться на одного пользователя.'
+    )
 
     class Meta:
         model = Subscription
         fields = ('user', 'subscription',)
+        read_only_fields = ('subscription',)
 
-    def validate(self, attrs):
-        user = attrs['user']
-        subscription = attrs['subscription']
-        if user == subscription:
-            raise ValidationError('Нельзя подписываться на себя.')
-        if Subscription.objects.filter(
-            user=user, subscription=subscription
-        ).exists():
-            raise ValidationError(
-                'Нельзя повторно подписываться на одного пользователя.'
-            )
-        return super().validate(attrs)
+    def create(self, validated_data):
+        if validated_data['user'] == validated_data['subscription']:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя подписываться на себя.'
+                ]
+            })
+        return super().create(validated_data)
 
     def to_representation(self, instance):
         return SubscriptionsSerializer.to_representation(self, instance)
@@ -97,7 +143,7 @@ class SubscriptionsSerializer(serializers.ModelSerializer):
         return Recipe.objects.filter(author=obj.subscription)
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.subscription).count()
+        return obj.subscription.recipes_count
 
     def to_representation(self, instance):
         return {
@@ -122,6 +168,9 @@ class SubscriptionsSerializer(serializers.ModelSerializer):
             ],
             'recipes_count': SubscriptionsSerializer.get_recipes_count(
                 self, instance
+            ),
+            'last_recipe_at': serializers.DateTimeField().to_representation(
+                instance.subscription.last_recipe_at
             )
         }
 
@@ -137,7 +186,7 @@ class TagSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tag
-        fields = '__all__'
+        exclude = ('bit',)
 
 
 class RecipeCreateIngredientSerializer(serializers.ModelSerializer):
@@ -167,10 +216,10 @@ class RecipeCreateIngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeDisplayIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.ReadOnlyField(source='ingredient.id')
-    name = serializers.ReadOnlyField(source='ingredient.name')
+    id = serializers.ReadOnlyField(source='ingredient.id', default=None)
+    name = serializers.ReadOnlyField(source='ingredient.name', default=None)
     measurement_unit = serializers.ReadOnlyField(
-        source='ingredient.measurement_unit'
+        source='ingredient.measurement_unit', default=None
     )
 
     class Meta:
@@ -178,6 +227,128 @@ class RecipeDisplayIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount',)
 
 
+class RecipeDisplayListSerializer(serializers.ListSerializer):
+
+    def get_user_relations(self, model, field, ids):
+        request = self.context.get('request', None)
+        if not (request and request.user.is_authenticated):
+            return set()
+        return set(model.objects.filter(
+            **{'user': request.user, f'{field}__in': ids}
+        ).values_list(field, flat=True))
+
+    def get_authors(self, author_ids, expanded):
+        if not expanded:
+            return {author_id: author_id for author_id in author_ids}
+        authors = {
+            author['id']: author for author in User.objects.filter(
+                id__in=author_ids
+            ).values('email', 'id', 'username', 'first_name', 'last_name')
+        }
+        subscriptions = self.get_user_relations(
+            Subscription, 'subscription', author_ids
+        )
+        for author_id, author in authors.items():
+            author['is_subscribed'] = author_id in subscriptions
+        return authors
+
+    def get_tags(self, recipe_ids, expanded):
+        tags = defaultdict(list)
+        recipe_tags = RecipeTag.objects.filter(
+            recipe__in=recipe_ids, tag__isnull=False
+        )
+        if not expanded:
+            for recipe_id, tag_id in recipe_tags.order_by(
+                'tag_id'
+            ).values_list('recipe', 'tag_id'):
+                tags[recipe_id].append(tag_id)
+            return tags
+        for recipe_id, *tag in recipe_tags.order_by('tag__name').values_list(
+            'recipe', 'tag__id', 'tag__name', 'tag__color', 'tag__slug'
+        ):
+            tags[recipe_id].append(
+                dict(zip(('id', 'name', 'color', 'slug'), tag))
+            )
+        return tags
+
+    def get_ingredients(self, recipe_ids, expanded):
+        ingredients = defaultdict(list)
+        keys = ('id', 'name', 'measurement_unit', 'amount')
+        fields = (
+            'ingredient__id', 'ingredient__name',
+            'ingredient__measurement_unit', 'scaled_amount'
+        )
+        if not expanded:
+            keys, fields = ('id', 'amount'), ('ingredient_id', 'scaled_amount')
+        for recipe_id, *ingredient in RecipeIngredient.objects.filter(
+            recipe__in=recipe_ids
+        ).annotate(
+            scaled_amount=models.F('amount') * self.context.get(
+                'servings', MIN_SERVINGS
+            )
+        ).order_by('recipe', 'id').values_list('recipe', *fields):
+            ingredients[recipe_id].append(dict(zip(keys, ingredient)))
+        return ingredients
+
+    def to_representation(self, data):
+        recipes = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        recipe_ids = [recipe.id for recipe in recipes]
+        request = self.context.get('request', None)
+        fields = self.context.get('fields') or RECIPE_FIELDS
+        expand = (
+            self.context.get('expand', ()) if self.context.get('fields')
+            else RECIPE_RELATIONS
+        )
+
+        if 'author' in fields:
+            authors = self.get_authors(
+                {recipe.author_id for recipe in recipes}, 'author' in expand
+            )
+        if 'tags' in fields:
+            tags = self.get_tags(recipe_ids, 'tags' in expand)
+        if 'ingredients' in fields:
+            ingredients = self.get_ingredients(
+                recipe_ids, 'ingredients' in expand
+            )
+        if 'is_favorited' in fields:
+            favorites = self.get_user_relations(
+                Favorite, 'recipe', recipe_ids
+            )
+        if 'is_in_shopping_cart' in fields:
+            shopping_cart = self.get_user_relations(
+                ShoppingCart, 'recipe', recipe_ids
+            )
+
+        def get_image(recipe):
+            image = recipe.image.url if recipe.image else None
+            if image and request is not None:
+                image = request.build_absolute_uri(image)
+            return image
+
+        getters = {
+            'id': lambda recipe: recipe.id,
+            'tags': lambda recipe: tags[recipe.id],
+            'author': lambda recipe: copy(authors[recipe.author_id]),
+            'ingredients': lambda recipe: ingredients[recipe.id],
+            'image': get_image,
+            'is_favorited': lambda recipe: recipe.id in favorites,
+            'is_in_shopping_cart': lambda recipe: recipe.id in shopping_cart,
+            'name': lambda recipe: recipe.name,
+            'text': lambda recipe: recipe.text,
+            'cooking_time': lambda recipe: recipe.cooking_time,
+        }
+        getters = [
+            (field, getters[field]) for field in RECIPE_FIELDS
+            if field in fields
+        ]
+        return [
+            {field: getter(recipe) for field, getter in getters}
+            for recipe in recipes
+        ]
+
+
 class RecipeDisplaySerializer(serializers.ModelSerializer):
     tags = TagSerializer(required=True, many=True)
     author = UserDisplaySerializer(
@@ -192,7 +363,11 @@ class RecipeDisplaySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
-        exclude = ('pub_date',)
+        exclude = (
+            'pub_date', 'updated', 'search_vector', 'tags_mask',
+            'neighbours_stale',
+        )
+        list_serializer_class = RecipeDisplayListSerializer
 
     def get_is_favorited(self, obj):
         request = self.context.get('request', None)
@@ -225,46 +400,83 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
     ingredients = RecipeCreateIngredientSerializer(required=True, many=True)
-    image = Base64ImageField(required=True)
+    image = Base64ImageField(required=False)
+    image_token = serializers.SlugRelatedField(
+        slug_field='token',
+        queryset=ImageUpload.objects.all(),
+        required=False,
+        write_only=True
+    )
 
     class Meta:
         model = Recipe
-        exclude = ('pub_date',)
+        exclude = (
+            'pub_date', 'updated', 'search_vector', 'tags_mask',
+            'neighbours_stale',
+        )
 
-    def get_tags_for_recipe(self, tags, recipe):
+    def get_tags_mask(self, tags):
+        mask = 0
         for tag in tags:
-            RecipeTag.objects.create(
-                recipe=recipe,
-                tag=tag
-            )
+            mask |= tag.mask
+        return mask
+
+    def get_tags_for_recipe(self, tags, recipe):
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=tag) for tag in tags
+        )
 
-    def get_ingredients_for_recipe(self, ingredients, recipe):
-        for ingredient in ingredients:
-            RecipeIngredient.objects.create(
+    def get_ingredients_for_recipe(self, ingredients, recipe, old_pairs=()):
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
                 recipe=recipe,
                 ingredient=ingredient['id'],
                 amount=ingredient['amount']
             )
+            for ingredient in ingredients
+        )
+        update_ingredient_index(set(old_pairs) | {
+            (ingredient['id'].id, recipe.id) for ingredient in ingredients
+        })
 
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        recipe = Recipe.objects.create(**validated_data)
-        self.get_tags_for_recipe(tags, recipe)
-        self.get_ingredients_for_recipe(ingredients, recipe)
+        validated_data['tags_mask'] = self.get_tags_mask(tags)
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            self.get_tags_for_recipe(tags, recipe)
+            self.get_ingredients_for_recipe(ingredients, recipe)
         return recipe
 
     def update(self, recipe, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        recipe = super().update(recipe, validated_data)
-        RecipeTag.objects.filter(recipe=recipe).delete()
-        RecipeIngredient.objects.filter(recipe=recipe).delete()
-        self.get_tags_for_recipe(tags, recipe)
-        self.get_ingredients_for_recipe(ingredients, recipe)
+        old_image = recipe.image.name
+        validated_data['tags_mask'] = self.get_tags_mask(tags)
+        with transaction.atomic():
+            recipe = super().update(recipe, validated_data)
+            if recipe.image.name != old_image:
+                transaction.on_commit(
+                    lambda: delete_unused_images((old_image,))
+                )
+            recipe_tags = RecipeTag.objects.filter(recipe=recipe)
+            recipe_tags._raw_delete(recipe_tags.db)
+            recipe_ingredients = RecipeIngredient.objects.filter(
+                recipe=recipe
+            )
+            old_pairs = list(recipe_ingredients.filter(
+                ingredient__isnull=False
+            ).values_list('ingredient', 'recipe'))
+            recipe_ingredients._raw_delete(recipe_ingredients.db)
+            self.get_tags_for_recipe(tags, recipe)
+            self.get_ingredients_for_recipe(ingredients, recipe, old_pairs)
         return recipe
 
     def validate(self, attrs):
+        image_upload = attrs.pop('image_token', None)
+        if image_upload is not None:
+            attrs['image'] = image_upload.image.name
         fields = (
             'tags', 'ingredients', 'name', 'image', 'text', 'cooking_time'
         )
@@ -282,6 +494,17 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate_image_token(self, value):
+        if value.user != self.context['request'].user:
+            raise serializers.ValidationError('Картинка не найдена.')
+        if value.created < timezone.now() - timedelta(
+            seconds=IMAGE_UPLOAD_TTL
+        ):
+            raise serializers.ValidationError(
+                'Срок действия загруженной картинки истек.'
+            )
+        return value
+
     def validate_tags(self, value):
         if not value:
             raise serializers.ValidationError(
@@ -314,25 +537,13 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return RecipeDisplaySerializer().to_representation(instance)
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(UniqueCreateSerializer):
+    unique_error_message = 'Нельзя повторно добавлять рецепт в избранное.'
 
     class Meta:
         model = Favorite
         fields = ('user', 'recipe',)
 
-    def validate(self, attrs):
-        user = attrs['user']
-        recipe = attrs['recipe']
-        if recipe is None:
-            raise ValidationError('Указанного рецепта не существует.')
-        if Favorite.objects.filter(
-            user=user, recipe=recipe
-        ).exists():
-            raise ValidationError(
-                'Нельзя повторно добавлять рецепт в избранное.'
-            )
-        return super().validate(attrs)
-
     def to_representation(self, instance):
         return {
             'id': instance.recipe.id,
@@ -342,29 +553,80 @@ class FavoriteSerializer(serializers.ModelSerializer):
         }
 
 
-class ShoppingCartSerializer(serializers.ModelSerializer):
+class ShoppingCartSerializer(UniqueCreateSerializer):
+    unique_error_message = 'Нельзя повторно добавлять рецепт в корзину.'
 
     class Meta:
         model = ShoppingCart
-        fields = ('user', 'recipe',)
-
-    def validate(self, attrs):
-        user = attrs['user']
-        recipe = attrs['recipe']
-        if recipe is None:
-            raise ValidationError('Указанного рецепта не существует.')
-        if ShoppingCart.objects.filter(
-            user=user, recipe=recipe
-        ).exists():
-            raise ValidationError(
-                'Нельзя повторно добавлять рецепт в корзину.'
-            )
-        return super().validate(attrs)
+        fields = ('user', 'recipe', 'servings',)
 
     def to_representation(self, instance):
         return {
             'id': instance.recipe.id,
             'name': instance.recipe.name,
             'image': str(instance.recipe.image),
-            'cooking_time': instance.recipe.cooking_time
+            'cooking_time': instance.recipe.cooking_time,
+            'servings': instance.servings
         }
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    image = serializers.FileField()
+
+    class Meta:
+        model = ImageUpload
+        fields = ('token', 'image', 'width', 'height')
+        read_only_fields = ('token', 'width', 'height')
+
+    def validate_image(self, value):
+        if value.size > MAX_IMAGE_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                'Размер картинки не может быть больше '
+                f'{MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)} МБ.'
+            )
+        try:
+            with Image.open(value) as image:
+                image_format, (width, height) = image.format, image.size
+        except (OSError, Image.DecompressionBombError):
+            raise serializers.ValidationError(
+                'Загрузите корректную картинку.'
+            )
+        if image_format not in IMAGE_FORMATS:
+            raise serializers.ValidationError(
+                f'Допустимые форматы картинки: {", ".join(IMAGE_FORMATS)}.'
+            )
+        if max(width, height) > MAX_IMAGE_SIDE:
+            raise serializers.ValidationError(
+                'Сторона картинки не может быть больше '
+                f'{MAX_IMAGE_SIDE} пикселей.'
+            )
+        value.seek(0)
+        value.image_size = (width, height)
+        return value
+
+    def create(self, validated_data):
+        validated_data['width'], validated_data['height'] = (
+            validated_data['image'].image_size
+        )
+        return super().create(validated_data)
+
+
+class BulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_BULK_ITEMS
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+class JobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'name', 'status', 'attempts', 'result', 'created',
+            'finished_at',
+        )
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.models import AUTH_FIELDS, User
+from .authentication import invalidate_token, invalidate_user_tokens
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_changed_token(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_token(instance.key)
+
+
+def get_auth_values(user):
+    return tuple(user.__dict__.get(name) for name in AUTH_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_auth_values(sender, instance, **kwargs):
+    instance.old_auth_values = get_auth_values(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_changed_user_tokens(sender, instance, created,
+                                   update_fields=None, **kwargs):
+    old_auth_values = instance.old_auth_values
+    instance.old_auth_values = get_auth_values(instance)
+    if created or (
+        update_fields is not None
+        and not set(update_fields) & set(AUTH_FIELDS)
+    ):
+        return
+    if instance.old_auth_values != old_auth_values:
+        invalidate_user_tokens(instance)
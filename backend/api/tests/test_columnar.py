@@ -0,0 +1,41 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+
+
+class ColumnarLayoutTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_catalog_changes_in_columnar_layout(self):
+        ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        response = self.client.get(
+            '/api/ingredients/', {'since': 0, 'layout': 'columnar'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['changed'], {
+            'id': [ingredient.id],
+            'name': ['мука'],
+            'measurement_unit': ['г'],
+        })
+
+    def test_empty_list_keeps_columns(self):
+        for path in ('/api/ingredients/', '/api/recipes/'):
+            response = self.client.get(path, {'layout': 'columnar'})
+            data = response.json()
+            if 'results' in data:
+                data = data['results']
+            self.assertIn('id', data)
+            self.assertEqual(set(map(len, data.values())), {0})
+
+    def test_empty_list_keeps_requested_fields(self):
+        response = self.client.get(
+            '/api/recipes/', {'layout': 'columnar', 'fields': 'id,name'}
+        )
+        self.assertEqual(
+            response.json()['results'], {'id': [], 'name': []}
+        )
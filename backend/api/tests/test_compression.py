@@ -0,0 +1,30 @@
+import gzip
+
+from django.test import TestCase
+
+from ingredients.models import Ingredient
+
+
+class CompressionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(100)
+        )
+
+    def test_api_json_is_compressed(self):
+        response = self.client.get(
+            '/api/ingredients/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(response.content).decode(
+            'utf-8'
+        ).split('"id"')), 101)
+
+    def test_other_responses_are_not_compressed(self):
+        response = self.client.get(
+            '/admin/login/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
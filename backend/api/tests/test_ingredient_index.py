@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.test import TestCase
+
+from backend.constants import INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_ANY
+from ingredients.models import Ingredient
+from recipes.ingredient_index import compact_index, filter_by_ingredients
+from recipes.models import IngredientIndexChange, Recipe, RecipeIngredient
+from users.models import User
+
+
+class RolledBack(Exception):
+    pass
+
+
+class IngredientIndexTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Авторов', password='pass'
+        )
+        cls.flour = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        cls.salt = Ingredient.objects.create(
+            name='соль', measurement_unit='по вкусу'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Описание', cooking_time=10,
+                image='images/recipe.png', author=author
+            )
+            for number in range(3)
+        ]
+        for recipe in cls.recipes:
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.flour, amount=100
+            )
+        compact_index()
+
+    def get_names(self, ingredients, match=INGREDIENTS_MATCH_ALL):
+        return set(filter_by_ingredients(
+            Recipe.objects.all(),
+            [ingredient.id for ingredient in ingredients],
+            match
+        ).values_list('name', flat=True))
+
+    def assert_names(self, ingredients, names, match=INGREDIENTS_MATCH_ALL):
+        self.assertEqual(self.get_names(ingredients, match), names)
+        compact_index()
+        self.assertFalse(IngredientIndexChange.objects.exists())
+        self.assertEqual(self.get_names(ingredients, match), names)
+
+    def test_rolled_back_savepoint_is_not_indexed(self):
+        first, second, third = self.recipes
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    RecipeIngredient.objects.create(
+                        recipe=second, ingredient=self.salt, amount=1
+                    )
+                    raise RolledBack
+            except RolledBack:
+                pass
+            for recipe in (first, third):
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=self.salt, amount=1
+                )
+        self.assert_names(
+            (self.flour, self.salt), {first.name, third.name}
+        )
+
+    def test_deleted_and_moved_rows(self):
+        first, second, third = self.recipes
+        RecipeIngredient.objects.filter(recipe=first).delete()
+        moved = RecipeIngredient.objects.get(recipe=second)
+        moved.ingredient = self.salt
+        moved.save()
+        self.assert_names((self.flour,), {third.name})
+        self.assert_names(
+            (self.flour, self.salt), {second.name, third.name},
+            INGREDIENTS_MATCH_ANY
+        )
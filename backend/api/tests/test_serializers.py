@@ -0,0 +1,93 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import RecipeDisplaySerializer
+from ingredients.models import Ingredient
+from recipes.models import (
+    Favorite, Recipe, RecipeIngredient, RecipeTag, ShoppingCart
+)
+from tags.models import Tag
+from users.models import Subscription, User
+
+
+class RecipeDisplayListSerializerTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Читатель', last_name='Читателев', password='pass'
+        )
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Авторов', password='pass'
+        )
+        Subscription.objects.create(user=cls.user, subscription=author)
+        breakfast = Tag.objects.create(
+            name='Завтрак', color='#E26C2D', slug='breakfast'
+        )
+        dinner = Tag.objects.create(
+            name='Ужин', color='#8775D2', slug='dinner'
+        )
+        flour = Ingredient.objects.create(name='мука', measurement_unit='г')
+        milk = Ingredient.objects.create(name='молоко', measurement_unit='мл')
+        salt = Ingredient.objects.create(
+            name='соль', measurement_unit='по вкусу'
+        )
+        for number, (tags, ingredients) in enumerate((
+            ((dinner, breakfast), ((flour, 200), (salt, 1), (milk, 300))),
+            ((breakfast,), ((milk, 500),)),
+            ((), ()),
+        )):
+            recipe = Recipe.objects.create(
+                name=f'Рецепт {number}', text='Описание',
+                cooking_time=10 + number, image='images/recipe.png',
+                author=author
+            )
+            for tag in tags:
+                RecipeTag.objects.create(recipe=recipe, tag=tag)
+            for ingredient, amount in ingredients:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+        Favorite.objects.create(user=cls.user, recipe=recipe)
+        ShoppingCart.objects.create(
+            user=cls.user, recipe=Recipe.objects.get(name='Рецепт 0')
+        )
+        salt.delete()
+
+    def get_context(self):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = self.user
+        return {'request': request}
+
+    def test_list_matches_single_recipes(self):
+        recipes = list(Recipe.objects.all())
+        context = self.get_context()
+        single = [
+            RecipeDisplaySerializer(recipe, context=context).data
+            for recipe in recipes
+        ]
+        many = RecipeDisplaySerializer(
+            recipes, many=True, context=context
+        ).data
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(many), renderer.render(single))
+
+    def test_deleted_ingredient_is_null(self):
+        recipe = Recipe.objects.get(name='Рецепт 0')
+        context = self.get_context()
+        for data in (
+            RecipeDisplaySerializer(recipe, context=context).data,
+            RecipeDisplaySerializer(
+                [recipe], many=True, context=context
+            ).data[0],
+        ):
+            self.assertEqual(data['ingredients'][1], {
+                'id': None,
+                'name': None,
+                'measurement_unit': None,
+                'amount': 1,
+            })
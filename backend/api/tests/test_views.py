@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from jobs.models import Job
+from recipes.models import Favorite, Recipe, RecipeIngredient, RecipeTag
+from recipes.tasks import delete_user_data
+from tags.models import Tag
+from users.models import User
+
+
+class UserDeletionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(
+            name='Завтрак', color='#E26C2D', slug='breakfast'
+        )
+        cls.ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('мука', 'сахар', 'соль')
+        ]
+
+    def create_author(self, username, recipes_count):
+        author = User.objects.create_user(
+            email=f'{username}@example.com', username=username,
+            first_name='Автор', last_name='Авторов', password='pass'
+        )
+        for number in range(recipes_count):
+            recipe = Recipe.objects.create(
+                name=f'{username} {number}', text='Описание', cooking_time=10,
+                image='images/recipe.png', author=author
+            )
+            RecipeTag.objects.create(recipe=recipe, tag=self.tag)
+            for ingredient in self.ingredients:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                )
+            Favorite.objects.create(user=author, recipe=recipe)
+        client = APIClient()
+        client.force_authenticate(author)
+        return author, client
+
+    def delete_me(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(
+                '/api/users/me/', {'current_password': 'pass'}
+            )
+        self.assertEqual(response.status_code, 204, response.content)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_recipes(self):
+        small, small_client = self.create_author('small', 2)
+        large, large_client = self.create_author('large', 8)
+        self.assertEqual(
+            self.delete_me(small_client), self.delete_me(large_client)
+        )
+        self.assertFalse(
+            User.objects.filter(id__in=(small.id, large.id)).exists()
+        )
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_large_author_is_deleted_in_background(self):
+        author, client = self.create_author('author', 3)
+        with mock.patch('recipes.tasks.DELETION_CHUNK_SIZE', 2):
+            self.delete_me(client)
+        author.refresh_from_db()
+        self.assertFalse(author.is_active)
+        self.assertEqual(Recipe.objects.filter(author=author).count(), 3)
+        self.assertTrue(Job.objects.filter(
+            name=delete_user_data.name, args=[author.id]
+        ).exists())
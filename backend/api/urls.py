@@ -4,6 +4,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     IngredientViewSet,
+    JobViewSet,
+    MetricsView,
     RecipeViewSet,
     TagViewSet,
     UsersViewSet
@@ -15,9 +17,11 @@ router_v1.register('users', UsersViewSet, basename='users')
 router_v1.register('ingredients', IngredientViewSet, basename='ingredients')
 router_v1.register('tags', TagViewSet, basename='tags')
 router_v1.register('recipes', RecipeViewSet, basename='recipes')
+router_v1.register('jobs', JobViewSet, basename='jobs')
 
 urlpatterns = [
     path('', include(router_v1.urls)),
     path('auth/token/login/', TokenCreateView.as_view(), name='login'),
     path('auth/token/logout/', TokenDestroyView.as_view(), name='logout'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
@@ -1,26 +1,60 @@
-from django.db.models import Sum
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import FileResponse
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from djoser.serializers import SetPasswordSerializer
+from djoser.serializers import SetPasswordSerializer, UserDeleteSerializer
 from djoser.views import UserViewSet
+from rest_framework import serializers
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
+from rest_framework.reverse import reverse
+from rest_framework.status import (
+    HTTP_201_CREATED, HTTP_202_ACCEPTED, HTTP_204_NO_CONTENT
+)
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from backend.constants import (
+    CATALOG_VERSION_HEADER,
+    MAX_SERVINGS,
+    MIN_SERVINGS,
+    RECIPE_FIELDS,
+    SHOPPING_LIST_FILENAME
+)
+from ingredients.catalog import get_catalog_changes, get_catalog_version
 from ingredients.models import Ingredient
-from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from jobs.models import Job
+from recipes.deletion import delete_recipes
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.shopping_list import save_shopping_list
+from recipes.tasks import build_shopping_list, schedule_user_deletion
 from tags.models import Tag
 from users.models import Subscription, User
 from .filters import IngredientFilter, RecipeFilter
-from .functions import get_many_to_many_instance, get_pagination_class
-from .mixins import ListRetrieveViewSet
+from .functions import (
+    delete_many_to_many_instance,
+    get_author_ordering,
+    get_file_response,
+    get_many_to_many_instance,
+    get_pagination_class,
+    get_sparse_fieldsets
+)
+from .metrics import render_metrics
+from .mixins import (
+    BulkManyToManyMixin,
+    ColumnarListMixin,
+    ListRetrieveViewSet,
+    ReplicaReadMixin
+)
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
     IngredientSerializer,
     FavoriteSerializer,
+    ImageUploadSerializer,
+    JobSerializer,
     RecipeCreateSerializer,
     RecipeDisplaySerializer,
     ShoppingCartSerializer,
@@ -28,11 +62,12 @@ from .serializers import (
     SubscriptionsSerializer,
     TagSerializer,
     UserDisplaySerializer,
+    UserProfileSerializer,
     UserSignUpSerializer
 )
 
 
-class UsersViewSet(UserViewSet):
+class UsersViewSet(ReplicaReadMixin, BulkManyToManyMixin, UserViewSet):
     http_method_names = ('get', 'head', 'post', 'delete')
     pagination_class = property(fget=get_pagination_class)
 
@@ -40,8 +75,19 @@ class UsersViewSet(UserViewSet):
         if self.action == 'subscribe':
             return Subscription.objects.all()
         if self.action == 'subscriptions':
-            return Subscription.objects.filter(user=self.request.user)
-        return User.objects.all()
+            queryset = Subscription.objects.filter(
+                user=self.request.user
+            ).select_related('subscription')
+            ordering = get_author_ordering(self.request, 'subscription__')
+        else:
+            queryset = User.objects.all()
+            ordering = (
+                get_author_ordering(self.request)
+                if self.action == 'list' else None
+            )
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'subscribe':
@@ -50,39 +96,55 @@ class UsersViewSet(UserViewSet):
             return SubscriptionsSerializer
         if self.action == 'set_password':
             return SetPasswordSerializer
+        if self.action in ('destroy', 'me') and (
+            self.request.method == 'DELETE'
+        ):
+            return UserDeleteSerializer
         if self.request.method == 'POST':
             return UserSignUpSerializer
+        if self.action in ('list', 'retrieve', 'me'):
+            return UserProfileSerializer
         return UserDisplaySerializer
 
     def get_permissions(self):
-        if self.action in ('subscribe', 'subscriptions', 'me'):
+        if self.action in (
+            'subscribe', 'bulk_subscribe', 'subscriptions', 'me'
+        ):
             self.permission_classes = (IsAuthenticated,)
         return super().get_permissions()
 
+    def perform_destroy(self, instance):
+        schedule_user_deletion(instance)
+
     @action(['post'], detail=True)
     def subscribe(self, request, id):
-        serializer = self.get_serializer(
-            data={
-                'user': self.request.user.id,
-                'subscription': get_object_or_404(User, id=id).id
-            }
-        )
+        serializer = self.get_serializer(data={})
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(subscription=get_object_or_404(User, id=id))
         return Response(serializer.data, status=HTTP_201_CREATED)
 
     @subscribe.mapping.delete
     def delete_subscribe(self, request, id):
-        instance = get_many_to_many_instance(request, id, Subscription)
-        instance.delete()
+        delete_many_to_many_instance(request, id, Subscription)
         return Response(status=HTTP_204_NO_CONTENT)
 
+    @action(['post'], detail=False, url_path='subscribe',
+            url_name='bulk-subscribe')
+    def bulk_subscribe(self, request):
+        return self.bulk_add(request, Subscription)
+
+    @bulk_subscribe.mapping.delete
+    def delete_bulk_subscribe(self, request):
+        return self.bulk_delete(request, Subscription)
+
     @action(['get'], detail=False)
     def subscriptions(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(
+    ReplicaReadMixin, BulkManyToManyMixin, ColumnarListMixin, ModelViewSet
+):
     queryset = Recipe.objects.all()
     http_method_names = ('get', 'head', 'post', 'patch', 'delete')
     filter_backends = (DjangoFilterBackend,)
@@ -92,104 +154,242 @@ class RecipeViewSet(ModelViewSet):
     def get_queryset(self):
         if self.action == 'favorite':
             return Favorite.objects.all()
-        if self.action in ('shopping_cart', 'download_shopping_cart'):
+        if self.action in (
+            'shopping_cart', 'update_shopping_cart', 'download_shopping_cart'
+        ):
             return ShoppingCart.objects.all()
-        return Recipe.objects.order_by('-pub_date', 'name')
+        queryset = Recipe.objects.defer('search_vector').order_by(
+            '-pub_date', 'name'
+        )
+        if self.action in (
+            'list', 'retrieve', 'similar', 'recommended'
+        ) and 'text' not in (
+            get_sparse_fieldsets(self.request).get('fields', RECIPE_FIELDS)
+        ):
+            queryset = queryset.defer('text')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'favorite':
             return FavoriteSerializer
-        if self.action in ('shopping_cart', 'download_shopping_cart'):
+        if self.action in (
+            'shopping_cart', 'update_shopping_cart', 'download_shopping_cart'
+        ):
             return ShoppingCartSerializer
+        if self.action == 'images':
+            return ImageUploadSerializer
         if self.request.method in ('POST', 'PATCH'):
             return RecipeCreateSerializer
         return RecipeDisplaySerializer
 
     def get_permissions(self):
         if self.action in (
-            'favorite', 'shopping_cart', 'download_shopping_cart'
+            'favorite', 'bulk_favorite', 'shopping_cart',
+            'bulk_shopping_cart', 'update_shopping_cart',
+            'download_shopping_cart', 'images', 'recommended'
         ):
             self.permission_classes = (IsAuthenticated,)
         else:
             self.permission_classes = (IsAuthorOrReadOnly,)
         return super().get_permissions()
 
-    def create_shopping_cart_txt(self, request):
-        recipes_list = ShoppingCart.objects.filter(
-            user=request.user
-        ).values_list('recipe')
-        ingredients = (
-            RecipeIngredient.objects.filter(
-                recipe__in=recipes_list
-            ).values('ingredient').annotate(total_amount=Sum('amount'))
-            .values_list(
-                'ingredient__name',
-                'total_amount',
-                'ingredient__measurement_unit'
-            ).order_by('ingredient__name',)
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'retrieve', 'similar', 'recommended'):
+            context.update(get_sparse_fieldsets(self.request))
+        if self.action == 'retrieve':
+            context['servings'] = serializers.IntegerField(
+                min_value=MIN_SERVINGS, max_value=MAX_SERVINGS
+            ).run_validation(
+                self.request.query_params.get('servings', MIN_SERVINGS)
+            )
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer([self.get_object()], many=True)
+        return Response(serializer.data[0])
+
+    def perform_destroy(self, instance):
+        delete_recipes((instance.id,))
+
+    @action(['get'], detail=True)
+    def similar(self, request, pk):
+        recipe = self.get_object()
+        serializer = self.get_serializer(
+            self.get_queryset().filter(neighbour_of__recipe=recipe).order_by(
+                '-neighbour_of__score', 'id'
+            ),
+            many=True
         )
+        return Response(serializer.data)
 
-        with open(
-            f'data/{request.user}_shopping_cart.txt', 'w'
-        ) as f:
-            f.write('Список ингредиентов: \n')
-            for ingredient in ingredients:
-                f.write(
-                    f'{ingredient[0]}: {ingredient[1]} {ingredient[2]} \n'
-                )
-        return f'data/{request.user}_shopping_cart.txt'
+    @action(['get'], detail=False)
+    def recommended(self, request):
+        page = self.paginate_queryset(
+            self.get_queryset().filter(
+                recommendations__user=request.user
+            ).order_by('-recommendations__score', 'id')
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(['post'], detail=False, parser_classes=(MultiPartParser,))
+    def images(self, request):
+        request._request.upload_handlers = [
+            TemporaryFileUploadHandler(request._request)
+        ]
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=HTTP_201_CREATED)
 
     @action(['post'], detail=True)
     def favorite(self, request, pk):
-        serializer = self.get_serializer(
-            data={
-                'user': self.request.user.id,
-                'recipe': pk
-            }
-        )
+        serializer = self.get_serializer(data={'recipe': pk})
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=HTTP_201_CREATED)
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk):
-        instance = get_many_to_many_instance(request, pk, Favorite)
-        instance.delete()
+        delete_many_to_many_instance(request, pk, Favorite)
         return Response(status=HTTP_204_NO_CONTENT)
 
+    @action(['post'], detail=False, url_path='favorite',
+            url_name='bulk-favorite')
+    def bulk_favorite(self, request):
+        return self.bulk_add(request, Favorite)
+
+    @bulk_favorite.mapping.delete
+    def delete_bulk_favorite(self, request):
+        return self.bulk_delete(request, Favorite)
+
     @action(['post'], detail=True)
     def shopping_cart(self, request, pk):
         serializer = self.get_serializer(
             data={
-                'user': self.request.user.id,
-                'recipe': pk
+                'recipe': pk,
+                'servings': request.data.get('servings', MIN_SERVINGS)
             }
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=HTTP_201_CREATED)
 
+    @shopping_cart.mapping.patch
+    def update_shopping_cart(self, request, pk):
+        serializer = self.get_serializer(
+            get_many_to_many_instance(request, pk, ShoppingCart).get(),
+            data={'servings': request.data.get('servings')},
+            partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
     @shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk):
-        instance = get_many_to_many_instance(request, pk, ShoppingCart)
-        instance.delete()
+        delete_many_to_many_instance(request, pk, ShoppingCart)
         return Response(status=HTTP_204_NO_CONTENT)
 
+    @action(['post'], detail=False, url_path='shopping_cart',
+            url_name='bulk-shopping-cart')
+    def bulk_shopping_cart(self, request):
+        return self.bulk_add(request, ShoppingCart)
+
+    @bulk_shopping_cart.mapping.delete
+    def delete_bulk_shopping_cart(self, request):
+        return self.bulk_delete(request, ShoppingCart)
+
     @action(['get'], detail=False)
     def download_shopping_cart(self, request):
-        shopping_cart = self.create_shopping_cart_txt(request)
-        return FileResponse(open(shopping_cart, 'rb'))
+        job_id = request.query_params.get('job')
+        if job_id is not None:
+            if not job_id.isdigit():
+                raise Http404
+            job = get_object_or_404(
+                Job,
+                id=job_id,
+                user=request.user,
+                name=build_shopping_list.name
+            )
+            if job.status != Job.DONE:
+                return Response(
+                    JobSerializer(job).data, status=HTTP_202_ACCEPTED
+                )
+            if not default_storage.exists(job.result['file']):
+                raise Http404
+            return get_file_response(
+                job.result['file'], SHOPPING_LIST_FILENAME
+            )
+        if request.query_params.get('async') == 'true':
+            job = build_shopping_list.enqueue(
+                request.user.id, user=request.user
+            )
+            return Response(
+                JobSerializer(job).data,
+                status=HTTP_202_ACCEPTED,
+                headers={'Location': reverse(
+                    'jobs-detail', args=(job.id,), request=request
+                )}
+            )
+        return get_file_response(
+            save_shopping_list(request.user.id), SHOPPING_LIST_FILENAME
+        )
 
 
-class IngredientViewSet(ListRetrieveViewSet):
+class IngredientViewSet(
+    ReplicaReadMixin, ColumnarListMixin, ListRetrieveViewSet
+):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is None:
+            version = get_catalog_version()
+            response = super().list(request, *args, **kwargs)
+        else:
+            layout = self.get_layout()
+            version, changed, removed = get_catalog_changes(
+                serializers.IntegerField(min_value=0).run_validation(since)
+            )
+            response = Response({
+                'version': version,
+                'changed': self.to_layout(
+                    self.get_serializer(changed, many=True).data, layout
+                ),
+                'removed': removed,
+            })
+        response[CATALOG_VERSION_HEADER] = version
+        return response
 
-class TagViewSet(ListRetrieveViewSet):
+
+class TagViewSet(ReplicaReadMixin, ListRetrieveViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+
+
+class JobViewSet(ListRetrieveViewSet):
+    serializer_class = JobSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = property(fget=get_pagination_class)
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(user=self.request.user)
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -5,5 +5,96 @@ MIN_INGREDIENT_AMOUNT = 1
 MAX_INGREDIENT_AMOUNT = 32000
 MIN_COOKING_TIME = 1
 MAX_COOKING_TIME = 32000
+MIN_SERVINGS = 1
+MAX_SERVINGS = 100
 
 PAGE_SIZE = 6
+
+MAX_BULK_ITEMS = 500
+
+RECIPE_FIELDS = (
+    'id', 'tags', 'author', 'ingredients', 'image', 'is_favorited',
+    'is_in_shopping_cart', 'name', 'text', 'cooking_time',
+)
+RECIPE_RELATIONS = ('tags', 'author', 'ingredients')
+
+MAX_TAGS = 63
+
+SEARCH_CONFIG = 'russian'
+
+INGREDIENTS_MATCH_ALL = 'all'
+INGREDIENTS_MATCH_ANY = 'any'
+INGREDIENTS_MATCH_BEST = 'best'
+INGREDIENT_INDEX_COMPACT_DELAY = 60
+
+LAYOUT_ROWS = 'rows'
+LAYOUT_COLUMNAR = 'columnar'
+
+AUTHOR_ORDERING = (
+    'recipes_count', '-recipes_count', 'last_recipe_at', '-last_recipe_at',
+)
+
+REPLICA_PIN_SECONDS = 10
+
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_MAX_RETRY_DELAY = 3600
+JOB_LEASE = 60
+JOB_HEARTBEAT_INTERVAL = 20
+JOB_POLL_INTERVAL = 1
+
+INGREDIENTS_FILE = 'data/ingredients.csv'
+CATALOG_BATCH_SIZE = 1000
+CATALOG_VERSION_HEADER = 'X-Catalog-Version'
+
+DELETION_CHUNK_SIZE = 1000
+
+SIMILAR_RECIPES_COUNT = 10
+SIMILAR_TAG_WEIGHT = 0.5
+SIMILAR_BLOCK_SIZE = 128
+SIMILAR_REFRESH_DELAY = 60
+
+RECOMMENDATIONS_COUNT = 50
+RECOMMENDATIONS_CART_WEIGHT = 0.5
+RECOMMENDATIONS_CHUNK_SIZE = 100
+
+IMAGES_DIR = 'images/'
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024
+MAX_IMAGE_SIDE = 5000
+IMAGE_UPLOAD_TTL = 24 * 60 * 60
+MEDIA_GC_GRACE_SECONDS = 3600
+MEDIA_GC_BATCH_SIZE = 1000
+
+SHOPPING_LISTS_DIR = 'shopping_lists'
+SHOPPING_LIST_FILENAME = 'shopping_cart.txt'
+SHOPPING_LIST_TTL = 24 * 60 * 60
+
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 60
+TOKEN_VERSION_TTL = 24 * 60 * 60
+
+DEFAULT_QUERY_BUDGETS = {
+    'UsersViewSet.list': 15,
+    'UsersViewSet.retrieve': 5,
+    'UsersViewSet.me': 5,
+    'UsersViewSet.subscriptions': 15,
+    'UsersViewSet.subscribe': 10,
+    'RecipeViewSet.list': 15,
+    'RecipeViewSet.retrieve': 15,
+    'RecipeViewSet.create': 25,
+    'RecipeViewSet.partial_update': 30,
+    'RecipeViewSet.destroy': 30,
+    'RecipeViewSet.favorite': 10,
+    'RecipeViewSet.shopping_cart': 10,
+    'RecipeViewSet.download_shopping_cart': 5,
+    'IngredientViewSet.list': 5,
+    'TagViewSet.list': 5,
+}
+
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_PATH_PREFIX = '/api/'
+COMPRESSIBLE_CONTENT_TYPES = (
+    'application/json', 'application/msgpack', 'text/'
+)
+BROTLI_QUALITY = 5
@@ -3,7 +3,7 @@ from pathlib import Path
 
 from django.core.management.utils import get_random_secret_key
 
-from .constants import PAGE_SIZE
+from .constants import DEFAULT_QUERY_BUDGETS, PAGE_SIZE
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -29,10 +29,13 @@ INSTALLED_APPS = [
     'tags.apps.TagsConfig',
     'users.apps.UsersConfig',
     'recipes.apps.RecipesConfig',
+    'jobs.apps.JobsConfig',
     'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryMetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,8 +52,21 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'api.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS': [
@@ -60,6 +76,31 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': PAGE_SIZE,
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+TOKEN_CACHE_SHARED = os.getenv('TOKEN_CACHE_SHARED', False) == 'True'
+
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', 0))
+
+QUERY_BUDGETS = {
+    **DEFAULT_QUERY_BUDGETS,
+    **{
+        action.strip(): int(budget)
+        for action, budget in (
+            item.split('=')
+            for item in os.getenv('QUERY_BUDGETS', '').split(',')
+            if item.strip()
+        )
+    }
+}
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'PERMISSIONS': {
@@ -115,6 +156,31 @@ DATABASES_DICT = {
 
 DATABASES = DATABASES_DICT[SQLITE_BOOL]
 
+DB_REPLICAS = [
+    replica.strip() for replica in os.getenv('DB_REPLICAS', '').split(',')
+    if replica.strip()
+]
+
+REPLICA_DATABASES = []
+
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    if SQLITE_BOOL:
+        DATABASES[alias]['NAME'] = BASE_DIR / replica
+    else:
+        DATABASES[alias]['HOST'] = replica
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+JOBS_IN_PROCESS = os.getenv('JOBS_IN_PROCESS', str(SQLITE_BOOL)) == 'True'
+
+JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', 2))
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -160,4 +226,6 @@ STATIC_ROOT = '/app/backend_static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+SENDFILE_X_ACCEL = os.getenv('SENDFILE_X_ACCEL', False) == 'True'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
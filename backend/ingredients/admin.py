@@ -7,5 +7,5 @@ from .models import Ingredient
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit',)
     search_fields = ('name',)
-    list_filter = ('name',)
+    show_full_result_count = False
     empty_value_display = '-пусто-'
@@ -0,0 +1,74 @@
+import csv
+
+from django.db import transaction
+from django.db.models import F
+
+from backend.constants import CATALOG_BATCH_SIZE
+from .models import CatalogVersion, Ingredient, IngredientChange
+
+
+def get_catalog_version():
+    return CatalogVersion.objects.values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+def record_changes(ingredient_ids, deleted=False):
+    if not ingredient_ids:
+        return
+    with transaction.atomic():
+        versions = CatalogVersion.objects.filter(pk=1)
+        if not versions.update(version=F('version') + 1):
+            CatalogVersion.objects.create(pk=1, version=1)
+        version = versions.values_list('version', flat=True).get()
+        IngredientChange.objects.bulk_create(
+            (
+                IngredientChange(
+                    ingredient_id=ingredient_id,
+                    version=version,
+                    deleted=deleted
+                )
+                for ingredient_id in ingredient_ids
+            ),
+            batch_size=CATALOG_BATCH_SIZE
+        )
+
+
+def get_catalog_changes(since):
+    version = get_catalog_version()
+    ingredient_ids = set(IngredientChange.objects.filter(
+        version__gt=since, version__lte=version
+    ).values_list('ingredient_id', flat=True))
+    changed = Ingredient.objects.filter(id__in=ingredient_ids)
+    removed = sorted(
+        ingredient_ids - set(changed.values_list('id', flat=True))
+    )
+    return version, changed, removed
+
+
+def import_ingredients(path):
+    with open(path, 'r') as csvfile:
+        rows = {
+            (name.strip(), unit.strip()): None
+            for name, unit in csv.reader(csvfile)
+        }
+    with transaction.atomic():
+        for key in Ingredient.objects.values_list('name', 'measurement_unit'):
+            rows.pop(key, None)
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in rows
+            ),
+            batch_size=CATALOG_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        ingredient_ids = [
+            ingredient_id
+            for ingredient_id, *key in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+            if tuple(key) in rows
+        ]
+        record_changes(ingredient_ids)
+    return len(ingredient_ids)
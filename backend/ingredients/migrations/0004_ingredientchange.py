@@ -0,0 +1,43 @@
+# Generated by Django 3.2.3 on 2026-10-19 03:27
+
+from django.db import migrations, models
+
+
+def record_existing_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('ingredients', 'Ingredient')
+    IngredientChange = apps.get_model('ingredients', 'IngredientChange')
+    IngredientChange.objects.bulk_create(
+        (
+            IngredientChange(ingredient_id=ingredient_id)
+            for ingredient_id in Ingredient.objects.order_by(
+                'id'
+            ).values_list('id', flat=True).iterator()
+        ),
+        batch_size=1000
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingredients', '0003_alter_ingredient_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ingredient_id', models.BigIntegerField(verbose_name='id ингредиента')),
+                ('deleted', models.BooleanField(default=False, verbose_name='удалён')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение ингредиента',
+                'verbose_name_plural': 'Изменения ингредиентов',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.RunPython(
+            record_existing_ingredients, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.3 on 2026-10-19 04:33
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def create_catalog_version(apps, schema_editor):
+    CatalogVersion = apps.get_model('ingredients', 'CatalogVersion')
+    IngredientChange = apps.get_model('ingredients', 'IngredientChange')
+    IngredientChange.objects.update(version=F('id'))
+    CatalogVersion.objects.create(
+        pk=1,
+        version=IngredientChange.objects.aggregate(
+            version=Max('id')
+        )['version'] or 0
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingredients', '0004_ingredientchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='версия')),
+            ],
+            options={
+                'verbose_name': 'Версия каталога',
+                'verbose_name_plural': 'Версии каталога',
+            },
+        ),
+        migrations.AddField(
+            model_name='ingredientchange',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0, verbose_name='версия каталога'),
+        ),
+        migrations.RunPython(
+            create_catalog_version, migrations.RunPython.noop
+        ),
+    ]
@@ -26,3 +26,33 @@ class Ingredient(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class CatalogVersion(models.Model):
+    version = models.BigIntegerField(default=0, verbose_name='версия')
+
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версии каталога'
+
+    def __str__(self):
+        return str(self.version)
+
+
+class IngredientChange(models.Model):
+    ingredient_id = models.BigIntegerField(verbose_name='id ингредиента')
+    version = models.BigIntegerField(
+        default=0, db_index=True, verbose_name='версия каталога'
+    )
+    deleted = models.BooleanField(default=False, verbose_name='удалён')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='дата изменения'
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Изменение ингредиента'
+        verbose_name_plural = 'Изменения ингредиентов'
+
+    def __str__(self):
+        return f'{self.id}: {self.ingredient_id}'
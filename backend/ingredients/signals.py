@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import record_changes
+from .models import Ingredient
+
+
+@receiver(post_save, sender=Ingredient)
+def record_ingredient_save(sender, instance, **kwargs):
+    record_changes((instance.id,))
+
+
+@receiver(post_delete, sender=Ingredient)
+def record_ingredient_delete(sender, instance, **kwargs):
+    record_changes((instance.id,), deleted=True)
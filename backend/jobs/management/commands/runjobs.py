@@ -0,0 +1,47 @@
+import signal
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backend.constants import JOB_POLL_INTERVAL
+from jobs.models import Job
+from jobs.queue import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершить работу.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=JOB_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        while not self.stopping:
+            close_old_connections()
+            job = claim_job()
+            if job is None:
+                if options['once']:
+                    break
+                sleep(options['sleep'])
+                continue
+            job = run_job(job)
+            style = (
+                self.style.SUCCESS if job.status == Job.DONE
+                else self.style.WARNING
+            )
+            self.stdout.write(style(
+                f'{job.name} #{job.id}: {job.get_status_display()}'
+            ))
+
+    def stop(self, signum, frame):
+        self.stopping = True
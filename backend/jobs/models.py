@@ -0,0 +1,86 @@
+from django.db import models
+from django.utils import timezone
+
+from backend.constants import JOB_MAX_ATTEMPTS, MAX_FIELD_LENGTH
+from users.models import User
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'в очереди'),
+        (RUNNING, 'выполняется'),
+        (DONE, 'выполнена'),
+        (FAILED, 'завершилась с ошибкой'),
+    )
+
+    name = models.CharField(
+        max_length=MAX_FIELD_LENGTH,
+        verbose_name='задача'
+    )
+    args = models.JSONField(default=list, verbose_name='аргументы')
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name='именованные аргументы'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='пользователь'
+    )
+    status = models.CharField(
+        max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name='статус'
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name='результат')
+    error = models.TextField(blank=True, verbose_name='ошибка')
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=JOB_MAX_ATTEMPTS,
+        verbose_name='максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='время запуска'
+    )
+    created = models.DateTimeField('дата создания', auto_now_add=True)
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='начало выполнения'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='занята воркером до'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='окончание выполнения'
+    )
+
+    class Meta:
+        ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='job_status_run_at_idx'
+            ),
+        )
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
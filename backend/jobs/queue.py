@@ -0,0 +1,201 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from traceback import format_exc
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from backend.constants import (
+    JOB_HEARTBEAT_INTERVAL, JOB_LEASE, JOB_MAX_RETRY_DELAY, JOB_RETRY_DELAY
+)
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+executor = None
+executor_lock = threading.Lock()
+
+
+def task(func):
+    name = f'{func.__module__}.{func.__name__}'
+    registry[name] = func
+
+    def enqueue_task(*args, user=None, countdown=0, **kwargs):
+        return enqueue(name, args, kwargs, user, countdown)
+
+    func.name = name
+    func.enqueue = enqueue_task
+    return func
+
+
+def enqueue(name, args=(), kwargs=None, user=None, countdown=0):
+    job = Job.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        user=user,
+        run_at=timezone.now() + timedelta(seconds=countdown)
+    )
+    if settings.JOBS_IN_PROCESS:
+        transaction.on_commit(lambda: submit(job.id, countdown))
+    return job
+
+
+def on_commit_once(func):
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    for callback in connection.run_on_commit:
+        if callback[1] is func and callback[0] <= savepoint_ids:
+            return
+    transaction.on_commit(func)
+
+
+def get_retry_delay(attempts):
+    return min(JOB_RETRY_DELAY * 2 ** (attempts - 1), JOB_MAX_RETRY_DELAY)
+
+
+def get_lease_end():
+    return timezone.now() + timedelta(seconds=JOB_LEASE)
+
+
+def fail_abandoned_jobs(now):
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=models.F('max_attempts')
+    ).update(
+        status=Job.FAILED,
+        error='Воркер не завершил задачу за отведенное время.',
+        finished_at=now
+    )
+
+
+def claim_job(job_id=None):
+    now = timezone.now()
+    fail_abandoned_jobs(now)
+    jobs = Job.objects.filter(
+        models.Q(status=Job.QUEUED, run_at__lte=now)
+        | models.Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    if job_id is not None:
+        jobs = jobs.filter(id=job_id)
+    with transaction.atomic():
+        job = jobs.select_for_update(skip_locked=True).order_by(
+            'run_at', 'id'
+        ).first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(
+            id=job.id, status=job.status, attempts=job.attempts
+        ).update(
+            status=Job.RUNNING,
+            attempts=models.F('attempts') + 1,
+            started_at=now,
+            locked_until=get_lease_end()
+        )
+    if not claimed:
+        return None
+    job.status = Job.RUNNING
+    job.attempts += 1
+    job.started_at = now
+    return job
+
+
+def get_own_job(job):
+    return Job.objects.filter(
+        id=job.id, status=Job.RUNNING, attempts=job.attempts
+    )
+
+
+def send_heartbeats(job, stopped):
+    try:
+        while not stopped.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                get_own_job(job).update(locked_until=get_lease_end())
+            except Exception:
+                logger.exception(
+                    'Не удалось продлить фоновую задачу %s.', job.id
+                )
+    finally:
+        connections.close_all()
+
+
+def run_job(job):
+    stopped = threading.Event()
+    heartbeat = threading.Thread(
+        target=send_heartbeats, args=(job, stopped), daemon=True
+    )
+    heartbeat.start()
+    try:
+        result = registry[job.name](*job.args, **job.kwargs)
+    except Exception:
+        logger.exception(
+            'Фоновая задача %s (%s) завершилась с ошибкой.', job.id, job.name
+        )
+        job.error = format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=get_retry_delay(job.attempts)
+            )
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+    finally:
+        stopped.set()
+        heartbeat.join()
+    job.locked_until = None
+    if not get_own_job(job).update(
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        run_at=job.run_at,
+        finished_at=job.finished_at,
+        locked_until=None
+    ):
+        logger.warning(
+            'Фоновая задача %s уже передана другому воркеру.', job.id
+        )
+    return job
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.JOBS_WORKERS, thread_name_prefix='jobs'
+            )
+    return executor
+
+
+def submit(job_id, delay=0):
+    if delay > 0:
+        timer = threading.Timer(delay, submit, (job_id,))
+        timer.daemon = True
+        timer.start()
+        return
+    get_executor().submit(run_in_process, job_id)
+
+
+def run_in_process(job_id):
+    try:
+        job = claim_job(job_id)
+        if job is None:
+            return
+        job = run_job(job)
+        if job.status == Job.QUEUED:
+            submit(job.id, (job.run_at - timezone.now()).total_seconds())
+    except Exception:
+        logger.exception('Не удалось выполнить фоновую задачу %s.', job_id)
+    finally:
+        connections.close_all()
@@ -1,13 +1,61 @@
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
+from api.admin_filters import InputFilter
+from backend.constants import INGREDIENTS_MATCH_ANY
+from ingredients.models import Ingredient
+from tags.models import Tag
+from .deletion import delete_recipes
+from .ingredient_index import filter_by_ingredients
 from .models import (
-    Favorite, Recipe, RecipeIngredient, RecipeTag, ShoppingCart
+    Favorite, ImageUpload, Recipe, RecipeIngredient, RecipeTag, ShoppingCart
 )
 
 
+class AuthorFilter(InputFilter):
+    title = 'автору'
+    parameter_name = 'author'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author__username=self.value())
+
+
+class IngredientFilter(InputFilter):
+    title = 'ингредиенту'
+    parameter_name = 'ingredient'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return filter_by_ingredients(
+                queryset,
+                Ingredient.objects.filter(
+                    name__istartswith=self.value()
+                ).values_list('id', flat=True),
+                INGREDIENTS_MATCH_ANY
+            )
+
+
+class TagFilter(admin.SimpleListFilter):
+    title = 'тегу'
+    parameter_name = 'tag'
+
+    def lookups(self, request, model_admin):
+        return Tag.objects.values_list('slug', 'name')
+
+    def queryset(self, request, queryset):
+        if self.value():
+            tag = Tag.objects.filter(slug=self.value()).first()
+            if tag is None:
+                return queryset.none()
+            return queryset.with_any_tag(tag.mask)
+
+
 class IngredientInline(admin.TabularInline):
     model = Recipe.ingredients.through
     min_num = 1
+    raw_id_fields = ('ingredient',)
 
 
 class TagInline(admin.TabularInline):
@@ -20,19 +68,77 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         'name', 'text', 'author', 'pub_date', 'cooking_time', 'favorited_num',
     )
+    list_select_related = ('author',)
     readonly_fields = ('favorited_num',)
-    search_fields = ('name', 'author',)
-    list_filter = ('name', 'author', 'pub_date', 'ingredients', 'tags',)
+    search_fields = ('name', 'text',)
+    list_filter = ('pub_date', TagFilter, AuthorFilter, IngredientFilter,)
+    autocomplete_fields = ('author',)
+    show_full_result_count = False
     empty_value_display = '-пусто-'
     inlines = (IngredientInline, TagInline,)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'search_vector'
+        ).annotate(favorited_count=Coalesce(
+            Subquery(
+                Favorite.objects.filter(
+                    recipe=OuterRef('pk')
+                ).order_by().values('recipe').annotate(
+                    count=Count('id')
+                ).values('count')
+            ),
+            Value(0)
+        ))
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+
+    def delete_model(self, request, obj):
+        delete_recipes((obj.id,))
+
+    def delete_queryset(self, request, queryset):
+        delete_recipes(queryset.values_list('id', flat=True))
+
     def favorited_num(self, obj):
-        return obj.favorited_num()
+        return obj.favorited_count
 
     favorited_num.short_description = 'Добавлено в избранное'
+    favorited_num.admin_order_field = 'favorited_count'
+
+
+@admin.register(Favorite, ShoppingCart)
+class UserRecipeAdmin(admin.ModelAdmin):
+    list_display = ('recipe', 'user')
+    list_select_related = ('recipe', 'user')
+    raw_id_fields = ('recipe', 'user')
+    ordering = ('-id',)
+    show_full_result_count = False
+
+
+@admin.register(RecipeIngredient)
+class RecipeIngredientAdmin(admin.ModelAdmin):
+    list_display = ('recipe', 'ingredient', 'amount')
+    list_select_related = ('recipe', 'ingredient')
+    raw_id_fields = ('recipe', 'ingredient')
+    ordering = ('-id',)
+    show_full_result_count = False
+
+
+@admin.register(RecipeTag)
+class RecipeTagAdmin(admin.ModelAdmin):
+    list_display = ('recipe', 'tag')
+    list_select_related = ('recipe', 'tag')
+    raw_id_fields = ('recipe',)
+    ordering = ('-id',)
+    show_full_result_count = False
 
 
-admin.site.register(Favorite)
-admin.site.register(ShoppingCart)
-admin.site.register(RecipeIngredient)
-admin.site.register(RecipeTag)
+@admin.register(ImageUpload)
+class ImageUploadAdmin(admin.ModelAdmin):
+    list_display = ('token', 'user', 'image', 'width', 'height', 'created')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    show_full_result_count = False
@@ -0,0 +1,81 @@
+import os
+from time import time
+
+from django.db import connections, models, transaction
+from django.dispatch import Signal
+
+from backend.constants import DELETION_CHUNK_SIZE, MEDIA_GC_GRACE_SECONDS
+from .ingredient_index import remove_recipes_from_index
+from .models import (
+    Favorite,
+    ImageUpload,
+    Recipe,
+    RecipeIngredient,
+    RecipeNeighbour,
+    RecipeTag,
+    ShoppingCart,
+    UserRecommendation
+)
+from .stats import update_author_stats
+from .storage import image_storage
+
+recipes_deleted = Signal()
+
+
+def delete_unused_images(names):
+    names = set(filter(None, names))
+    used = set(Recipe.objects.filter(
+        image__in=names
+    ).values_list('image', flat=True)).union(ImageUpload.objects.filter(
+        image__in=names
+    ).values_list('image', flat=True))
+    deadline = time() - MEDIA_GC_GRACE_SECONDS
+    for name in names - used:
+        try:
+            if os.path.getmtime(image_storage.path(name)) <= deadline:
+                image_storage.delete(name)
+        except FileNotFoundError:
+            pass
+
+
+def delete_recipes(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    for start in range(0, len(recipe_ids), DELETION_CHUNK_SIZE):
+        chunk = recipe_ids[start:start + DELETION_CHUNK_SIZE]
+        recipes = Recipe.objects.filter(id__in=chunk)
+        with transaction.atomic(using=recipes.db):
+            rows = list(recipes.values_list('image', 'author'))
+            images = [image for image, _ in rows]
+            remove_recipes_from_index(RecipeIngredient.objects.filter(
+                recipe__in=chunk, ingredient__isnull=False
+            ).values_list('ingredient', 'recipe'))
+            Recipe.objects.filter(neighbours__neighbour__in=chunk).exclude(
+                id__in=chunk
+            ).update(neighbours_stale=True)
+            neighbours = RecipeNeighbour.objects.filter(
+                models.Q(recipe__in=chunk) | models.Q(neighbour__in=chunk)
+            )
+            neighbours._raw_delete(neighbours.db)
+            recommendations = UserRecommendation.objects.filter(
+                recipe__in=chunk
+            )
+            recommendations._raw_delete(recommendations.db)
+            if connections[recipes.db].vendor != 'postgresql':
+                for model in (RecipeIngredient, RecipeTag, Favorite,
+                              ShoppingCart):
+                    related = model.objects.filter(recipe__in=chunk)
+                    related._raw_delete(related.db)
+            recipes._raw_delete(recipes.db)
+            update_author_stats({author_id for _, author_id in rows})
+            recipes_deleted.send(sender=Recipe, recipe_ids=chunk)
+            transaction.on_commit(
+                lambda images=images: delete_unused_images(images),
+                using=recipes.db
+            )
+
+
+def delete_user(user):
+    delete_recipes(Recipe.objects.filter(author=user).order_by(
+        'id'
+    ).values_list('id', flat=True))
+    user.delete()
@@ -0,0 +1,203 @@
+import json
+from array import array
+from collections import Counter
+from itertools import groupby
+
+from django.db import connections, models, transaction
+from django.db.models.expressions import RawSQL
+
+from backend.constants import (
+    INGREDIENTS_MATCH_ALL, INGREDIENTS_MATCH_BEST
+)
+from ingredients.models import Ingredient
+from .models import (
+    IngredientIndexChange, IngredientRecipes, RecipeIngredient
+)
+
+ARRAY_TYPECODE = 'q'
+REBUILD_BATCH_SIZE = 1000
+
+
+def encode_ids(ids):
+    return array(ARRAY_TYPECODE, ids).tobytes()
+
+
+def decode_ids(data):
+    ids = array(ARRAY_TYPECODE)
+    ids.frombytes(bytes(data))
+    return ids
+
+
+def record_index_changes(pairs):
+    IngredientIndexChange.objects.bulk_create(
+        (
+            IngredientIndexChange(
+                ingredient_id=ingredient_id, recipe_id=recipe_id
+            )
+            for ingredient_id, recipe_id in set(pairs)
+        ),
+        batch_size=REBUILD_BATCH_SIZE
+    )
+
+
+def get_pending_changes(ingredient_ids):
+    rows = list(IngredientIndexChange.objects.filter(
+        ingredient_id__in=ingredient_ids
+    ).values_list('id', 'ingredient_id', 'recipe_id'))
+    if not rows:
+        return [], {}
+    existing = set(RecipeIngredient.objects.filter(
+        ingredient__in={ingredient_id for _, ingredient_id, _ in rows},
+        recipe__in={recipe_id for _, _, recipe_id in rows}
+    ).values_list('ingredient', 'recipe'))
+    changes = {}
+    for _, ingredient_id, recipe_id in rows:
+        changes.setdefault(ingredient_id, {})[recipe_id] = (
+            (ingredient_id, recipe_id) in existing
+        )
+    return [change_id for change_id, _, _ in rows], changes
+
+
+def apply_changes(recipe_ids, changes):
+    return sorted(
+        {
+            recipe_id for recipe_id in recipe_ids
+            if recipe_id not in changes
+        } | {
+            recipe_id for recipe_id, present in changes.items() if present
+        }
+    )
+
+
+def compact_index():
+    ingredient_ids = sorted(set(
+        IngredientIndexChange.objects.values_list('ingredient_id', flat=True)
+    ))
+    compacted = 0
+    for start in range(0, len(ingredient_ids), REBUILD_BATCH_SIZE):
+        batch = ingredient_ids[start:start + REBUILD_BATCH_SIZE]
+        with transaction.atomic():
+            existing = set(Ingredient.objects.filter(
+                id__in=batch
+            ).values_list('id', flat=True))
+            IngredientIndexChange.objects.filter(
+                ingredient_id__in=set(batch) - existing
+            ).delete()
+            IngredientRecipes.objects.bulk_create(
+                (
+                    IngredientRecipes(ingredient_id=ingredient_id)
+                    for ingredient_id in existing
+                ),
+                ignore_conflicts=True
+            )
+            indexes = list(IngredientRecipes.objects.select_for_update(
+                skip_locked=True
+            ).filter(ingredient__in=existing).order_by('ingredient_id'))
+            change_ids, changes = get_pending_changes(
+                [index.ingredient_id for index in indexes]
+            )
+            for index in indexes:
+                index.recipe_ids = encode_ids(apply_changes(
+                    decode_ids(index.recipe_ids),
+                    changes.get(index.ingredient_id, {})
+                ))
+            IngredientRecipes.objects.bulk_update(
+                indexes, ('recipe_ids',), batch_size=REBUILD_BATCH_SIZE
+            )
+            IngredientIndexChange.objects.filter(id__in=change_ids).delete()
+            compacted += len(change_ids)
+    return compacted
+
+
+def remove_recipes_from_index(pairs):
+    removed = {}
+    for ingredient_id, recipe_id in pairs:
+        removed.setdefault(ingredient_id, set()).add(recipe_id)
+    with transaction.atomic():
+        indexes = list(IngredientRecipes.objects.select_for_update().filter(
+            ingredient__in=list(removed)
+        ).order_by('ingredient_id'))
+        for index in indexes:
+            recipe_ids = removed[index.ingredient_id]
+            index.recipe_ids = encode_ids(
+                recipe_id for recipe_id in decode_ids(index.recipe_ids)
+                if recipe_id not in recipe_ids
+            )
+        IngredientRecipes.objects.bulk_update(
+            indexes, ('recipe_ids',), batch_size=REBUILD_BATCH_SIZE
+        )
+
+
+def rebuild_index(ingredient_ids=None):
+    pairs = RecipeIngredient.objects.filter(
+        ingredient__isnull=False, recipe__isnull=False
+    )
+    indexes = IngredientRecipes.objects.all()
+    if ingredient_ids is not None:
+        pairs = pairs.filter(ingredient__in=ingredient_ids)
+        indexes = indexes.filter(ingredient__in=ingredient_ids)
+    pairs = pairs.order_by('ingredient_id', 'recipe_id').distinct(
+    ).values_list('ingredient', 'recipe').iterator()
+    with transaction.atomic():
+        indexes.delete()
+        batch = []
+        for ingredient_id, group in groupby(pairs, key=lambda pair: pair[0]):
+            batch.append(IngredientRecipes(
+                ingredient_id=ingredient_id,
+                recipe_ids=encode_ids(recipe_id for _, recipe_id in group)
+            ))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                IngredientRecipes.objects.bulk_create(batch)
+                batch = []
+        IngredientRecipes.objects.bulk_create(batch)
+
+
+def get_coverage(ingredient_ids):
+    indexes = dict(IngredientRecipes.objects.filter(
+        ingredient__in=ingredient_ids
+    ).values_list('ingredient', 'recipe_ids'))
+    _, changes = get_pending_changes(ingredient_ids)
+    arrays = []
+    for ingredient_id in set(indexes) | set(changes):
+        recipe_ids = decode_ids(indexes.get(ingredient_id, b''))
+        if ingredient_id in changes:
+            recipe_ids = apply_changes(recipe_ids, changes[ingredient_id])
+        arrays.append(recipe_ids)
+    return arrays, Counter(
+        recipe_id for recipe_ids in arrays for recipe_id in recipe_ids
+    )
+
+
+def get_ids_expression(queryset, ids):
+    ids = list(ids)
+    if connections[queryset.db].vendor == 'postgresql':
+        return RawSQL('SELECT unnest(%s::bigint[])', (ids,))
+    return RawSQL('SELECT value FROM json_each(%s)', (json.dumps(ids),))
+
+
+def filter_by_ingredients(queryset, ingredient_ids, match):
+    ingredient_ids = set(ingredient_ids)
+    arrays, coverage = get_coverage(ingredient_ids)
+    if match == INGREDIENTS_MATCH_ALL:
+        if len(arrays) < len(ingredient_ids):
+            return queryset.none()
+        arrays.sort(key=len)
+        recipe_ids = set(arrays[0]).intersection(*arrays[1:])
+        return queryset.filter(
+            id__in=get_ids_expression(queryset, recipe_ids)
+        )
+    queryset = queryset.filter(id__in=get_ids_expression(queryset, coverage))
+    if match != INGREDIENTS_MATCH_BEST:
+        return queryset
+    levels = {}
+    for recipe_id, count in coverage.items():
+        levels.setdefault(count, []).append(recipe_id)
+    return queryset.annotate(coverage=models.Case(
+        *(
+            models.When(
+                id__in=get_ids_expression(queryset, recipe_ids), then=count
+            ) for count, recipe_ids in levels.items()
+        ),
+        default=0,
+        output_field=models.IntegerField()
+    )).order_by('-coverage', *queryset.query.order_by)
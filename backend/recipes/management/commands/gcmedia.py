@@ -0,0 +1,126 @@
+import os
+from datetime import timedelta
+from time import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.constants import (
+    IMAGE_UPLOAD_TTL,
+    IMAGES_DIR,
+    MEDIA_GC_BATCH_SIZE,
+    MEDIA_GC_GRACE_SECONDS,
+    SHOPPING_LIST_TTL,
+    SHOPPING_LISTS_DIR
+)
+from recipes.models import ImageUpload, Recipe
+from recipes.storage import image_storage
+
+
+def scan_files(path):
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные загрузки картинок и файлы, на которые '
+        'не ссылается ни один рецепт или загрузка, и списки покупок, '
+        'которые не скачивали дольше суток. Файлы моложе периода '
+        'ожидания не удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести файлы, которые будут удалены.'
+        )
+        parser.add_argument(
+            '--grace', type=int, default=MEDIA_GC_GRACE_SECONDS,
+            help='Минимальный возраст удаляемого файла в секундах.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MEDIA_GC_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        self.delete_shopping_lists(options['dry_run'])
+        path = image_storage.path(IMAGES_DIR)
+        if not os.path.isdir(path):
+            self.stdout.write('Каталог с картинками не найден.')
+            return
+        expires = timezone.now() - timedelta(seconds=IMAGE_UPLOAD_TTL)
+        if not options['dry_run']:
+            ImageUpload.objects.filter(created__lt=expires).delete()
+        deadline = time() - options['grace']
+        scanned = removed = reclaimed = 0
+        for batch in batches(scan_files(path), options['batch_size']):
+            scanned += len(batch)
+            files = {
+                os.path.relpath(
+                    entry.path, image_storage.location
+                ).replace(os.sep, '/'): entry
+                for entry in batch
+            }
+            used = set(Recipe.objects.filter(
+                image__in=list(files)
+            ).values_list('image', flat=True)).union(
+                ImageUpload.objects.filter(
+                    image__in=list(files), created__gte=expires
+                ).values_list('image', flat=True)
+            )
+            for name, entry in files.items():
+                if name in used:
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime > deadline:
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    image_storage.delete(name)
+                removed += 1
+                reclaimed += stat.st_size
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {scanned}, '
+            f'{"к удалению" if options["dry_run"] else "удалено"}: '
+            f'{removed}, освобождено байт: {reclaimed}.'
+        ))
+
+    def delete_shopping_lists(self, dry_run):
+        path = default_storage.path(SHOPPING_LISTS_DIR)
+        if not os.path.isdir(path):
+            return
+        deadline = time() - SHOPPING_LIST_TTL
+        removed = 0
+        for entry in scan_files(path):
+            if entry.stat(follow_symlinks=False).st_mtime > deadline:
+                continue
+            name = os.path.relpath(
+                entry.path, default_storage.location
+            ).replace(os.sep, '/')
+            if dry_run:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+            removed += 1
+        self.stdout.write(
+            f'Списков покупок '
+            f'{"к удалению" if dry_run else "удалено"}: {removed}.'
+        )
@@ -0,0 +1,199 @@
+import io
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from backend.constants import INGREDIENTS_FILE
+from ingredients.catalog import import_ingredients
+from ingredients.models import Ingredient
+from recipes.ingredient_index import rebuild_index
+from recipes.stats import update_author_stats
+from recipes.models import (
+    Favorite, Recipe, RecipeIngredient, RecipeTag, ShoppingCart
+)
+from tags.models import Tag
+from users.models import Subscription, User
+
+IMAGE_NAME = 'images/generated.png'
+PASSWORD = 'benchmark-password'
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+    ('Десерт', '#D2A875', 'dessert'),
+    ('Выпечка', '#75B8D2', 'bakery'),
+)
+WORDS = (
+    'нарезать', 'смешать', 'добавить', 'обжарить', 'варить', 'запечь',
+    'посолить', 'охладить', 'подавать', 'перемешать', 'минут', 'огонь',
+    'сковорода', 'кастрюля', 'духовка', 'тесто', 'соус', 'начинка',
+)
+RUN_LABEL_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+RUN_LABEL_LENGTH = 6
+MIN_RECIPE_INGREDIENTS = 5
+MAX_RECIPE_INGREDIENTS = 40
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетических пользователей, подписки, рецепты, '
+        'избранное и корзины для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--subscriptions', type=int, default=10,
+            help='Количество подписок на пользователя.'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Количество избранных рецептов на пользователя.'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=5,
+            help='Количество рецептов в корзине на пользователя.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        run = ''.join(self.random.choices(RUN_LABEL_CHARS, k=RUN_LABEL_LENGTH))
+        if User.objects.filter(username__startswith=f'{run}_').exists():
+            raise CommandError(
+                f'Данные с меткой {run} уже сгенерированы, '
+                'укажите другой --seed.'
+            )
+
+        ingredient_ids = self.create_ingredients()
+        tag_ids = self.create_tags()
+        image = self.create_image()
+        user_ids = self.create_users(run, options['users'])
+        recipe_ids = self.create_recipes(
+            run, options['recipes'], user_ids, image
+        )
+        self.create_recipe_relations(recipe_ids, ingredient_ids, tag_ids)
+        rebuild_index()
+        self.create_user_relations(
+            Subscription, 'subscription', user_ids, user_ids,
+            options['subscriptions']
+        )
+        self.create_user_relations(
+            Favorite, 'recipe', user_ids, recipe_ids, options['favorites']
+        )
+        self.create_user_relations(
+            ShoppingCart, 'recipe', user_ids, recipe_ids, options['cart']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)} (метка {run}).'
+        ))
+
+    def bulk_create(self, model, objs, **kwargs):
+        for chunk in chunks(objs, self.batch_size):
+            model.objects.bulk_create(chunk, **kwargs)
+
+    def create_ingredients(self):
+        if not Ingredient.objects.exists():
+            import_ingredients(INGREDIENTS_FILE)
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def create_tags(self):
+        for name, color, slug in TAGS:
+            if not Tag.objects.filter(slug=slug).exists():
+                Tag.objects.create(name=name, color=color, slug=slug)
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_image(self):
+        if not default_storage.exists(IMAGE_NAME):
+            content = io.BytesIO()
+            Image.new('RGB', (64, 64), '#E26C2D').save(content, 'PNG')
+            default_storage.save(IMAGE_NAME, ContentFile(content.getvalue()))
+        return IMAGE_NAME
+
+    def create_users(self, run, count):
+        password = make_password(PASSWORD)
+        self.bulk_create(User, (
+            User(
+                email=f'{run}_{number}@example.com',
+                username=f'{run}_{number}',
+                first_name=f'Имя {number}',
+                last_name=f'Фамилия {number}',
+                password=password
+            ) for number in range(count)
+        ))
+        return list(User.objects.filter(
+            username__startswith=f'{run}_'
+        ).values_list('id', flat=True))
+
+    def create_recipes(self, run, count, user_ids, image):
+        self.bulk_create(Recipe, (
+            Recipe(
+                name=f'Рецепт {run} {number}',
+                text=' '.join(self.random.choices(WORDS, k=60)),
+                cooking_time=self.random.randint(5, 180),
+                image=image,
+                author_id=self.random.choice(user_ids)
+            ) for number in range(count)
+        ))
+        update_author_stats(user_ids)
+        return list(Recipe.objects.filter(
+            name__startswith=f'Рецепт {run} '
+        ).values_list('id', flat=True))
+
+    def create_recipe_relations(self, recipe_ids, ingredient_ids, tag_ids):
+        max_ingredients = min(MAX_RECIPE_INGREDIENTS, len(ingredient_ids))
+        min_ingredients = min(MIN_RECIPE_INGREDIENTS, max_ingredients)
+        self.bulk_create(RecipeIngredient, (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=self.random.randint(1, 1000)
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in self.random.sample(
+                ingredient_ids,
+                self.random.randint(min_ingredients, max_ingredients)
+            )
+        ))
+        self.bulk_create(RecipeTag, (
+            RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in self.random.sample(
+                tag_ids, self.random.randint(1, min(3, len(tag_ids)))
+            )
+        ))
+        Recipe.objects.update_tags_mask()
+
+    def create_user_relations(self, model, field, user_ids, target_ids,
+                              count):
+        self.bulk_create(
+            model,
+            (
+                model(**{'user_id': user_id, f'{field}_id': target_id})
+                for user_id in user_ids
+                for target_id in self.random.sample(
+                    target_ids, min(count, len(target_ids))
+                )
+                if target_id != user_id or model is not Subscription
+            ),
+            ignore_conflicts=True
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ingredient_index import compact_index, rebuild_index
+from recipes.models import IngredientRecipes
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает индекс рецептов по ингредиентам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compact', action='store_true',
+            help='Только перенести накопленные изменения в индекс.'
+        )
+
+    def handle(self, *args, **options):
+        if options['compact']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Перенесено изменений: {compact_index()}.'
+            ))
+            return
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            'Индекс перестроен, ингредиентов: '
+            f'{IngredientRecipes.objects.count()}.'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import rebuild_neighbours, refresh_stale_neighbours
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие рецепты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help='Пересчитать только измененные рецепты и их соседей.'
+        )
+
+    def handle(self, *args, **options):
+        if options['stale']:
+            count = refresh_stale_neighbours()
+        else:
+            count = rebuild_neighbours()
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие рецепты пересчитаны, рецептов: {count}.'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from backend.constants import RECOMMENDATIONS_CHUNK_SIZE
+from recipes.recommendations import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации рецептов по избранному '
+        'и корзинам пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            help='Количество процессов (по умолчанию — по числу ядер).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=RECOMMENDATIONS_CHUNK_SIZE,
+            help='Количество пользователей в одной порции.'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_recommendations(
+            options['workers'], options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендации пересчитаны, пользователей: {count}.'
+        ))
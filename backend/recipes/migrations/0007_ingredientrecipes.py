@@ -0,0 +1,54 @@
+# Generated by Django 3.2.3 on 2026-10-19 03:04
+
+from array import array
+from itertools import groupby
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_ingredient_index(apps, schema_editor):
+    IngredientRecipes = apps.get_model('recipes', 'IngredientRecipes')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    pairs = RecipeIngredient.objects.filter(
+        ingredient__isnull=False, recipe__isnull=False
+    ).order_by('ingredient_id', 'recipe_id').distinct().values_list(
+        'ingredient', 'recipe'
+    ).iterator()
+    IngredientRecipes.objects.bulk_create(
+        (
+            IngredientRecipes(
+                ingredient_id=ingredient_id,
+                recipe_ids=array(
+                    'q', (recipe_id for _, recipe_id in group)
+                ).tobytes()
+            )
+            for ingredient_id, group in groupby(pairs, key=lambda p: p[0])
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingredients', '0003_alter_ingredient_options'),
+        ('recipes', '0006_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientRecipes',
+            fields=[
+                ('ingredient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recipes_index', serialize=False, to='ingredients.ingredient', verbose_name='ингредиент')),
+                ('recipe_ids', models.BinaryField(default=bytes, verbose_name='идентификаторы рецептов')),
+            ],
+            options={
+                'verbose_name': 'Рецепты с ингредиентом',
+                'verbose_name_plural': 'Рецепты с ингредиентами',
+            },
+        ),
+        migrations.RunPython(
+            build_ingredient_index, migrations.RunPython.noop
+        ),
+    ]
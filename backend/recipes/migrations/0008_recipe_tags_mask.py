@@ -0,0 +1,41 @@
+# Generated by Django 3.2.3 on 2026-10-19 03:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_tags_mask(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    Tag = apps.get_model('tags', 'Tag')
+    masks = RecipeTag.objects.filter(
+        recipe=models.OuterRef('pk')
+    ).values('recipe').annotate(mask=models.Sum(
+        models.Case(
+            *(
+                models.When(tag=tag_id, then=1 << bit)
+                for tag_id, bit in Tag.objects.values_list('id', 'bit')
+            ),
+            default=0,
+            output_field=models.BigIntegerField()
+        ),
+        distinct=True
+    )).values('mask')
+    Recipe.objects.update(tags_mask=Coalesce(models.Subquery(masks), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_tag_bit'),
+        ('recipes', '0007_ingredientrecipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tags_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='маска тегов'),
+        ),
+        migrations.RunPython(fill_tags_mask, migrations.RunPython.noop),
+    ]
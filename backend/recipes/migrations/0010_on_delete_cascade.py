@@ -0,0 +1,67 @@
+from django.db import migrations
+
+CASCADE_FIELDS = (
+    ('recipes', 'Recipe', 'author'),
+    ('recipes', 'RecipeIngredient', 'recipe'),
+    ('recipes', 'RecipeTag', 'recipe'),
+    ('recipes', 'Favorite', 'user'),
+    ('recipes', 'Favorite', 'recipe'),
+    ('recipes', 'ShoppingCart', 'user'),
+    ('recipes', 'ShoppingCart', 'recipe'),
+    ('recipes', 'IngredientRecipes', 'ingredient'),
+    ('users', 'Subscription', 'user'),
+    ('users', 'Subscription', 'subscription'),
+)
+
+
+def set_on_delete(apps, schema_editor, on_delete):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for app_label, model_name, field_name in CASCADE_FIELDS:
+        model = apps.get_model(app_label, model_name)
+        field = model._meta.get_field(field_name)
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+        for name, constraint in constraints.items():
+            if (
+                not constraint['foreign_key']
+                or constraint['columns'] != [field.column]
+            ):
+                continue
+            schema_editor.execute(
+                f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}'
+            )
+            schema_editor.execute(
+                f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} '
+                f'FOREIGN KEY ({quote(field.column)}) '
+                f'REFERENCES {quote(field.related_model._meta.db_table)} '
+                f'({quote(field.target_field.column)}) '
+                f'{on_delete} DEFERRABLE INITIALLY DEFERRED'
+            )
+
+
+def add_on_delete_cascade(apps, schema_editor):
+    set_on_delete(apps, schema_editor, 'ON DELETE CASCADE')
+
+
+def remove_on_delete_cascade(apps, schema_editor):
+    set_on_delete(apps, schema_editor, '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_shoppingcart_servings'),
+        ('users', '0005_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            add_on_delete_cascade, remove_on_delete_cascade
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.3 on 2026-10-19 04:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import recipes.storage
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0011_recipe_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='токен')),
+                ('image', models.ImageField(storage=recipes.storage.ContentAddressedStorage(), upload_to='images/', verbose_name='картинка')),
+                ('width', models.PositiveIntegerField(verbose_name='ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='высота')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата загрузки')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'Загруженная картинка',
+                'verbose_name_plural': 'Загруженные картинки',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -1,16 +1,69 @@
+from uuid import uuid4
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField
+)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models
+from django.db.models.functions import Coalesce
 
 from backend.constants import (
+    IMAGES_DIR,
     MAX_COOKING_TIME,
     MAX_FIELD_LENGTH,
     MAX_INGREDIENT_AMOUNT,
+    MAX_SERVINGS,
     MIN_COOKING_TIME,
-    MIN_INGREDIENT_AMOUNT
+    MIN_INGREDIENT_AMOUNT,
+    MIN_SERVINGS,
+    SEARCH_CONFIG
 )
 from ingredients.models import Ingredient
 from tags.models import Tag
 from users.models import User
+from .storage import image_storage
+
+
+class RecipeQuerySet(models.QuerySet):
+
+    def search(self, value):
+        if connections[self.db].vendor == 'postgresql':
+            query = SearchQuery(
+                value, config=SEARCH_CONFIG, search_type='websearch'
+            )
+            return self.filter(search_vector=query).annotate(
+                rank=SearchRank(models.F('search_vector'), query)
+            ).order_by('-rank', *Recipe._meta.ordering)
+        return self.filter(
+            models.Q(name__icontains=value) | models.Q(text__icontains=value)
+        ).annotate(
+            rank=models.Case(
+                models.When(name__icontains=value, then=1),
+                default=0,
+                output_field=models.IntegerField()
+            )
+        ).order_by('-rank', *Recipe._meta.ordering)
+
+    def with_any_tag(self, mask):
+        return self.alias(
+            tags_match=models.F('tags_mask').bitand(mask)
+        ).filter(tags_match__gt=0)
+
+    def update_tags_mask(self):
+        masks = RecipeTag.objects.filter(
+            recipe=models.OuterRef('pk')
+        ).values('recipe').annotate(mask=models.Sum(
+            models.Case(
+                *(
+                    models.When(tag=tag.id, then=tag.mask)
+                    for tag in Tag.objects.only('bit')
+                ),
+                default=0,
+                output_field=models.BigIntegerField()
+            ),
+            distinct=True
+        )).values('mask')
+        return self.update(tags_mask=Coalesce(models.Subquery(masks), 0))
 
 
 class Recipe(models.Model):
@@ -19,7 +72,11 @@ class Recipe(models.Model):
         unique=True,
         verbose_name='название'
     )
-    image = models.ImageField(upload_to='images/', verbose_name='картинка')
+    image = models.ImageField(
+        upload_to=IMAGES_DIR,
+        storage=image_storage,
+        verbose_name='картинка'
+    )
     text = models.TextField(verbose_name='описание')
     cooking_time = models.PositiveSmallIntegerField(
         validators=[
@@ -41,6 +98,7 @@ class Recipe(models.Model):
         verbose_name='время приготовления'
     )
     pub_date = models.DateTimeField('дата публикации', auto_now_add=True)
+    updated = models.DateTimeField('дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -59,6 +117,24 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='теги'
     )
+    tags_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='маска тегов'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='поисковый вектор'
+    )
+    neighbours_stale = models.BooleanField(
+        default=True,
+        editable=False,
+        db_index=True,
+        verbose_name='нужно пересчитать похожие рецепты'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date', 'name',)
@@ -108,7 +184,7 @@ class RecipeIngredient(models.Model):
     )
 
     class Meta:
-        ordering = ('recipe',)
+        ordering = ('recipe', 'id')
         verbose_name = 'Ингредиент в рецепте'
         verbose_name_plural = 'Ингредиенты в рецептах'
 
@@ -139,6 +215,72 @@ class RecipeTag(models.Model):
         return self.recipe.name
 
 
+class IngredientRecipes(models.Model):
+    ingredient = models.OneToOneField(
+        Ingredient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recipes_index',
+        verbose_name='ингредиент'
+    )
+    recipe_ids = models.BinaryField(
+        default=bytes,
+        verbose_name='идентификаторы рецептов'
+    )
+
+    class Meta:
+        verbose_name = 'Рецепты с ингредиентом'
+        verbose_name_plural = 'Рецепты с ингредиентами'
+
+    def __str__(self):
+        return str(self.ingredient_id)
+
+
+class IngredientIndexChange(models.Model):
+    ingredient_id = models.BigIntegerField(
+        db_index=True,
+        verbose_name='id ингредиента'
+    )
+    recipe_id = models.BigIntegerField(verbose_name='id рецепта')
+
+    class Meta:
+        verbose_name = 'Изменение индекса ингредиентов'
+        verbose_name_plural = 'Изменения индекса ингредиентов'
+
+    def __str__(self):
+        return f'{self.ingredient_id}: {self.recipe_id}'
+
+
+class RecipeNeighbour(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='neighbours',
+        verbose_name='рецепт'
+    )
+    neighbour = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='neighbour_of',
+        verbose_name='похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='сходство')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                name='unique_recipe_neighbour',
+                fields=('recipe', 'neighbour')
+            ),
+        )
+        ordering = ('recipe', '-score')
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+
+    def __str__(self):
+        return f'{self.recipe_id} → {self.neighbour_id}'
+
+
 class Favorite(models.Model):
     user = models.ForeignKey(
         User,
@@ -181,6 +323,26 @@ class ShoppingCart(models.Model):
         related_name='shopping_cart',
         verbose_name='рецепт в корзине'
     )
+    servings = models.PositiveSmallIntegerField(
+        default=MIN_SERVINGS,
+        validators=[
+            MinValueValidator(
+                MIN_SERVINGS,
+                message=(
+                    'Количество порций не может быть '
+                    f'меньше {MIN_SERVINGS}.'
+                )
+            ),
+            MaxValueValidator(
+                MAX_SERVINGS,
+                message=(
+                    'Количество порций не может быть '
+                    f'больше {MAX_SERVINGS}.'
+                )
+            )
+        ],
+        verbose_name='количество порций'
+    )
 
     class Meta:
         constraints = (
@@ -195,3 +357,72 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return self.recipe.name
+
+
+class UserRecommendation(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='рекомендованный рецепт'
+    )
+    score = models.FloatField(verbose_name='оценка')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                name='unique_user_recommendation',
+                fields=('user', 'recipe')
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-score'),
+                name='recommendation_user_score_idx'
+            ),
+        )
+        ordering = ('user', '-score')
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+
+    def __str__(self):
+        return f'{self.user_id} → {self.recipe_id}'
+
+
+class ImageUpload(models.Model):
+    token = models.UUIDField(
+        default=uuid4,
+        unique=True,
+        editable=False,
+        verbose_name='токен'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name='пользователь'
+    )
+    image = models.ImageField(
+        upload_to=IMAGES_DIR,
+        storage=image_storage,
+        verbose_name='картинка'
+    )
+    width = models.PositiveIntegerField(verbose_name='ширина')
+    height = models.PositiveIntegerField(verbose_name='высота')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='дата загрузки'
+    )
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Загруженная картинка'
+        verbose_name_plural = 'Загруженные картинки'
+
+    def __str__(self):
+        return str(self.token)
@@ -0,0 +1,133 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.db import connections, transaction
+from scipy import sparse
+
+from backend.constants import (
+    RECOMMENDATIONS_CART_WEIGHT,
+    RECOMMENDATIONS_CHUNK_SIZE,
+    RECOMMENDATIONS_COUNT
+)
+from users.models import User
+from .models import Favorite, Recipe, ShoppingCart, UserRecommendation
+from .similarity import get_positions
+
+worker_data = {}
+
+
+def get_interactions(user_ids, recipe_ids):
+    rows, columns, weights = [], [], []
+    for model, weight in (
+        (Favorite, 1), (ShoppingCart, RECOMMENDATIONS_CART_WEIGHT)
+    ):
+        pairs = np.array(
+            list(model.objects.order_by().values_list('user', 'recipe')),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        user_positions, user_found = get_positions(user_ids, pairs[:, 0])
+        recipe_positions, recipe_found = get_positions(
+            recipe_ids, pairs[:, 1]
+        )
+        found = user_found & recipe_found
+        rows.append(user_positions[found])
+        columns.append(recipe_positions[found])
+        weights.append(np.full(found.sum(), weight, np.float32))
+    interactions = sparse.coo_matrix(
+        (
+            np.concatenate(weights),
+            (np.concatenate(rows), np.concatenate(columns))
+        ),
+        shape=(len(user_ids), len(recipe_ids)),
+        dtype=np.float32
+    ).tocsr()
+    interactions.sum_duplicates()
+    return interactions
+
+
+def get_item_similarity(interactions):
+    norms = np.sqrt(np.asarray(
+        interactions.multiply(interactions).sum(axis=0)
+    ))
+    norms[norms == 0] = 1
+    normalized = sparse.csc_matrix(interactions.multiply(1 / norms))
+    similarity = sparse.csr_matrix(normalized.T.dot(normalized))
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def init_worker(interactions, similarity, authors):
+    worker_data.update(
+        interactions=interactions, similarity=similarity, authors=authors
+    )
+
+
+def score_users(start, stop):
+    interactions = worker_data['interactions'][start:stop]
+    authors = worker_data['authors']
+    scores = interactions.dot(worker_data['similarity']).toarray()
+    scores[interactions.nonzero()] = 0
+    own = np.flatnonzero((authors >= start) & (authors < stop))
+    scores[authors[own] - start, own] = 0
+    count = min(RECOMMENDATIONS_COUNT, scores.shape[1])
+    top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return (
+        start,
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1)
+    )
+
+
+def save_recommendations(user_ids, recipe_ids, start, top, top_scores):
+    chunk_ids = user_ids[start:start + len(top)].tolist()
+    with transaction.atomic():
+        UserRecommendation.objects.filter(user__in=chunk_ids).delete()
+        UserRecommendation.objects.bulk_create(
+            UserRecommendation(
+                user_id=user_id, recipe_id=recipe_id, score=score
+            )
+            for row, user_id in enumerate(chunk_ids)
+            for recipe_id, score in zip(
+                recipe_ids[top[row]].tolist(), top_scores[row].tolist()
+            )
+            if score > 0
+        )
+
+
+def rebuild_recommendations(workers=None,
+                            chunk_size=RECOMMENDATIONS_CHUNK_SIZE):
+    user_ids = np.array(
+        list(User.objects.order_by('id').values_list('id', flat=True)),
+        dtype=np.int64
+    )
+    recipes = np.array(
+        list(Recipe.objects.order_by('id').values_list('id', 'author')),
+        dtype=np.int64
+    ).reshape(-1, 2)
+    recipe_ids = recipes[:, 0]
+    if not len(recipe_ids):
+        UserRecommendation.objects.all().delete()
+        return 0
+    authors, found = get_positions(user_ids, recipes[:, 1])
+    authors[~found] = -1
+    interactions = get_interactions(user_ids, recipe_ids)
+    similarity = get_item_similarity(interactions)
+    starts = range(0, len(user_ids), chunk_size)
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(interactions, similarity, authors)
+    ) as executor:
+        for start, top, top_scores in executor.map(
+            score_users,
+            starts,
+            (start + chunk_size for start in starts)
+        ):
+            save_recommendations(
+                user_ids, recipe_ids, start, top, top_scores
+            )
+    return len(user_ids)
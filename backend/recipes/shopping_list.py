@@ -0,0 +1,98 @@
+import os
+from hashlib import sha256
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models.functions import Cast
+
+from backend.constants import SHOPPING_LISTS_DIR
+from ingredients.catalog import get_catalog_version
+from .models import RecipeIngredient, ShoppingCart
+
+UNIT_CONVERSIONS = {
+    'кг': ('г', 1000),
+    'л': ('мл', 1000),
+    'стакан': ('мл', 200),
+    'ст. л.': ('мл', 15),
+    'ч. л.': ('мл', 5),
+}
+UNIT_SCALES = {
+    'г': ('кг', 1000),
+    'мл': ('л', 1000),
+}
+UNITS_WITHOUT_AMOUNT = ('по вкусу',)
+
+
+def get_shopping_list(user_id):
+    unit = models.F('ingredient__measurement_unit')
+    return RecipeIngredient.objects.filter(
+        recipe__shopping_cart__user=user_id, ingredient__isnull=False
+    ).annotate(
+        unit=models.Case(
+            *(
+                models.When(
+                    ingredient__measurement_unit=source, then=models.Value(
+                        target
+                    )
+                ) for source, (target, _) in UNIT_CONVERSIONS.items()
+            ),
+            default=unit,
+            output_field=models.CharField()
+        ),
+        factor=models.Case(
+            *(
+                models.When(ingredient__measurement_unit=source, then=factor)
+                for source, (_, factor) in UNIT_CONVERSIONS.items()
+            ),
+            default=1,
+            output_field=models.IntegerField()
+        )
+    ).values('ingredient__name', 'unit').annotate(
+        total_amount=models.Sum(models.ExpressionWrapper(
+            Cast('amount', models.BigIntegerField())
+            * models.F('factor')
+            * models.F('recipe__shopping_cart__servings'),
+            output_field=models.BigIntegerField()
+        ))
+    ).values_list(
+        'ingredient__name', 'total_amount', 'unit'
+    ).order_by('ingredient__name', 'unit')
+
+
+def format_amount(amount, unit):
+    if unit in UNITS_WITHOUT_AMOUNT:
+        return unit
+    if unit in UNIT_SCALES:
+        scaled_unit, scale = UNIT_SCALES[unit]
+        if amount >= scale:
+            amount, unit = amount / scale, scaled_unit
+    amount = f'{amount:.2f}'.rstrip('0').rstrip('.').replace('.', ',')
+    return f'{amount} {unit}'
+
+
+def render_shopping_list(ingredients):
+    return 'Список ингредиентов: \n' + ''.join(
+        f'{name}: {format_amount(amount, unit)} \n'
+        for name, amount, unit in ingredients
+    )
+
+
+def get_shopping_list_key(user_id):
+    cart = ShoppingCart.objects.filter(user=user_id).order_by(
+        'recipe'
+    ).values_list('recipe', 'servings', 'recipe__updated')
+    return sha256(
+        repr((get_catalog_version(), list(cart))).encode()
+    ).hexdigest()
+
+
+def save_shopping_list(user_id):
+    name = f'{SHOPPING_LISTS_DIR}/{get_shopping_list_key(user_id)}.txt'
+    try:
+        os.utime(default_storage.path(name))
+        return name
+    except FileNotFoundError:
+        pass
+    content = render_shopping_list(get_shopping_list(user_id)).encode()
+    return default_storage.save(name, ContentFile(content))
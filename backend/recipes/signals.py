@@ -0,0 +1,163 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from jobs.queue import on_commit_once
+from tags.models import Tag
+from users.models import User
+from .deletion import recipes_deleted
+from .models import Recipe, RecipeIngredient, RecipeTag
+from .stats import update_author_stats
+from .tasks import schedule_neighbours_refresh, update_ingredient_index
+
+
+def get_index_pair(recipe_ingredient):
+    if (
+        recipe_ingredient is None
+        or recipe_ingredient.recipe_id is None
+        or recipe_ingredient.ingredient_id is None
+    ):
+        return None
+    return recipe_ingredient.ingredient_id, recipe_ingredient.recipe_id
+
+
+@receiver(post_init, sender=RecipeIngredient)
+def remember_index_pair(sender, instance, **kwargs):
+    instance.old_index_pair = None
+    if not instance.get_deferred_fields() & {'recipe_id', 'ingredient_id'}:
+        instance.old_index_pair = get_index_pair(instance)
+
+
+class TouchedRecipes(set):
+
+    def __call__(self):
+        Recipe.objects.filter(pk__in=self).update(
+            updated=timezone.now(), neighbours_stale=True
+        )
+        schedule_neighbours_refresh()
+
+
+def touch_recipes(recipe_ids):
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    for callback in connection.run_on_commit:
+        if (
+            isinstance(callback[1], TouchedRecipes)
+            and callback[0] <= savepoint_ids
+        ):
+            callback[1].update(recipe_ids)
+            return
+    transaction.on_commit(TouchedRecipes(recipe_ids))
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=RecipeTag)
+@receiver(post_delete, sender=RecipeTag)
+def touch_recipe(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    recipe_ids = {instance.recipe_id}
+    old_pair = getattr(instance, 'old_index_pair', None)
+    if old_pair is not None:
+        recipe_ids.add(old_pair[1])
+    recipe_ids.discard(None)
+    if recipe_ids:
+        touch_recipes(recipe_ids)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def add_to_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new_pair = get_index_pair(instance)
+    update_ingredient_index({instance.old_index_pair, new_pair} - {None})
+    instance.old_index_pair = new_pair
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def delete_from_index(sender, instance, **kwargs):
+    update_ingredient_index({get_index_pair(instance)} - {None})
+
+
+@receiver(post_init, sender=Recipe)
+def remember_author(sender, instance, **kwargs):
+    instance.old_author_id = instance.__dict__.get('author_id')
+
+
+@receiver(pre_save, sender=Recipe)
+def load_deferred_author(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    if (
+        raw
+        or instance._state.adding
+        or instance.old_author_id is not None
+        or update_fields is not None
+        and not {'author', 'author_id'} & set(update_fields)
+    ):
+        return
+    instance.old_author_id = Recipe.objects.filter(
+        pk=instance.pk
+    ).values_list('author', flat=True).first()
+
+
+@receiver(post_save, sender=Recipe)
+def add_to_author_stats(sender, instance, created, raw=False, **kwargs):
+    old_author_id = instance.old_author_id
+    instance.old_author_id = instance.author_id
+    if raw:
+        return
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1,
+            last_recipe_at=instance.pub_date
+        )
+        return
+    if old_author_id is not None and old_author_id != instance.author_id:
+        update_author_stats((old_author_id, instance.author_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_from_author_stats(sender, instance, **kwargs):
+    update_author_stats((instance.author_id,))
+
+
+@receiver(pre_save, sender=Recipe)
+def mark_neighbours_stale(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.neighbours_stale = True
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(recipes_deleted, sender=Recipe)
+def refresh_neighbours(sender, raw=False, **kwargs):
+    if not raw:
+        on_commit_once(schedule_neighbours_refresh)
+
+
+@receiver(post_save, sender=RecipeTag)
+def add_to_tags_mask(sender, instance, created, raw=False, **kwargs):
+    if raw or instance.recipe_id is None:
+        return
+    recipes = Recipe.objects.filter(pk=instance.recipe_id)
+    if not created:
+        recipes.update_tags_mask()
+    elif instance.tag is not None:
+        recipes.update(tags_mask=F('tags_mask').bitor(instance.tag.mask))
+
+
+@receiver(post_delete, sender=RecipeTag)
+def delete_from_tags_mask(sender, instance, **kwargs):
+    if instance.recipe_id is not None and instance.tag_id is not None:
+        Recipe.objects.filter(pk=instance.recipe_id).update_tags_mask()
+
+
+@receiver(pre_delete, sender=Tag)
+def clear_tag_bit(sender, instance, **kwargs):
+    Recipe.objects.with_any_tag(instance.mask).update(
+        tags_mask=F('tags_mask').bitand(~instance.mask)
+    )
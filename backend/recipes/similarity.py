@@ -0,0 +1,199 @@
+import numpy as np
+from django.db import models, transaction
+from scipy import sparse
+
+from backend.constants import (
+    SIMILAR_BLOCK_SIZE, SIMILAR_RECIPES_COUNT, SIMILAR_TAG_WEIGHT
+)
+from .ingredient_index import get_ids_expression
+from .models import Recipe, RecipeIngredient, RecipeNeighbour, RecipeTag
+
+
+def get_positions(recipe_ids, ids):
+    ids = np.asarray(list(ids), dtype=np.int64)
+    positions = np.searchsorted(recipe_ids, ids)
+    found = positions < len(recipe_ids)
+    found[found] = recipe_ids[positions[found]] == ids[found]
+    return positions, found
+
+
+def filter_recipes(queryset, field, recipe_ids):
+    if recipe_ids is None:
+        return queryset
+    return queryset.filter(**{
+        f'{field}__in': get_ids_expression(queryset, recipe_ids)
+    })
+
+
+def get_candidate_ids(recipe_ids):
+    candidate_ids = set(recipe_ids)
+    for model, field in (
+        (RecipeIngredient, 'ingredient'), (RecipeTag, 'tag')
+    ):
+        features = filter_recipes(
+            model.objects.filter(**{f'{field}__isnull': False}),
+            'recipe',
+            recipe_ids
+        ).values(field)
+        candidate_ids.update(model.objects.filter(**{
+            f'{field}__in': features, 'recipe__isnull': False
+        }).values_list('recipe', flat=True))
+    return candidate_ids
+
+
+def get_recipe_vectors(candidate_ids=None):
+    recipe_ids = np.array(
+        list(filter_recipes(
+            Recipe.objects.order_by('id'), 'id', candidate_ids
+        ).values_list('id', flat=True)),
+        dtype=np.int64
+    )
+    rows, columns, weights = [], [], []
+    offset = 0
+    for model, field, weight in (
+        (RecipeIngredient, 'ingredient', 1),
+        (RecipeTag, 'tag', SIMILAR_TAG_WEIGHT)
+    ):
+        pairs = np.array(
+            list(filter_recipes(model.objects.filter(**{
+                'recipe__isnull': False, f'{field}__isnull': False
+            }), 'recipe', candidate_ids).order_by().values_list(
+                'recipe', field
+            ).distinct()),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        positions, found = get_positions(recipe_ids, pairs[:, 0])
+        features, feature_columns = np.unique(
+            pairs[found, 1], return_inverse=True
+        )
+        rows.append(positions[found])
+        columns.append(feature_columns + offset)
+        weights.append(np.full(len(feature_columns), weight, np.float32))
+        offset += len(features)
+    vectors = sparse.csr_matrix(
+        (
+            np.concatenate(weights),
+            (np.concatenate(rows), np.concatenate(columns))
+        ),
+        shape=(len(recipe_ids), offset),
+        dtype=np.float32
+    )
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)))
+    norms[norms == 0] = 1
+    return recipe_ids, sparse.csr_matrix(vectors.multiply(1 / norms))
+
+
+def get_thresholds(recipe_ids):
+    thresholds = np.zeros(len(recipe_ids), dtype=np.float32)
+    rows = np.array(
+        list(filter_recipes(
+            RecipeNeighbour.objects.order_by(), 'recipe', recipe_ids.tolist()
+        ).values('recipe').annotate(
+            total=models.Count('id'), minimum=models.Min('score')
+        ).filter(total__gte=SIMILAR_RECIPES_COUNT).values_list(
+            'recipe', 'minimum'
+        )),
+        dtype=np.float64
+    ).reshape(-1, 2)
+    positions, found = get_positions(recipe_ids, rows[:, 0])
+    thresholds[positions[found]] = rows[found, 1]
+    return thresholds
+
+
+def score_block(vectors, positions):
+    scores = vectors.dot(vectors[positions].T.toarray())
+    scores[positions, np.arange(len(positions))] = 0
+    count = min(SIMILAR_RECIPES_COUNT, len(scores) - 1)
+    top = np.argpartition(-scores, count - 1, axis=0)[:count]
+    top_scores = np.take_along_axis(scores, top, axis=0)
+    order = np.argsort(-top_scores, axis=0, kind='stable')
+    return (
+        scores,
+        np.take_along_axis(top, order, axis=0),
+        np.take_along_axis(top_scores, order, axis=0)
+    )
+
+
+def save_neighbours(recipe_ids, positions, top, top_scores):
+    block_ids = recipe_ids[positions].tolist()
+    with transaction.atomic():
+        RecipeNeighbour.objects.filter(recipe__in=block_ids).delete()
+        RecipeNeighbour.objects.bulk_create(
+            RecipeNeighbour(
+                recipe_id=recipe_id, neighbour_id=neighbour_id, score=score
+            )
+            for column, recipe_id in enumerate(block_ids)
+            for neighbour_id, score in zip(
+                recipe_ids[top[:, column]].tolist(),
+                top_scores[:, column].tolist()
+            )
+            if score > 0
+        )
+
+
+def score_recipes(recipe_ids, vectors, positions, thresholds=None):
+    affected = np.zeros(len(recipe_ids), dtype=bool)
+    if len(recipe_ids) < 2:
+        RecipeNeighbour.objects.filter(
+            recipe__in=recipe_ids[positions].tolist()
+        ).delete()
+        return affected
+    for start in range(0, len(positions), SIMILAR_BLOCK_SIZE):
+        block = positions[start:start + SIMILAR_BLOCK_SIZE]
+        scores, top, top_scores = score_block(vectors, block)
+        if thresholds is not None:
+            affected |= (scores > thresholds[:, np.newaxis]).any(axis=1)
+        save_neighbours(recipe_ids, block, top, top_scores)
+    return affected
+
+
+def update_neighbours(changed_ids=None):
+    if changed_ids is None:
+        recipe_ids, vectors = get_recipe_vectors()
+        if len(recipe_ids) < 2:
+            RecipeNeighbour.objects.all().delete()
+            return 0
+        score_recipes(recipe_ids, vectors, np.arange(len(recipe_ids)))
+        return len(recipe_ids)
+    changed_ids = set(changed_ids)
+    affected_ids = set(RecipeNeighbour.objects.filter(
+        neighbour__in=changed_ids
+    ).values_list('recipe', flat=True))
+    recipe_ids, vectors = get_recipe_vectors(get_candidate_ids(changed_ids))
+    positions, found = get_positions(recipe_ids, sorted(changed_ids))
+    affected = score_recipes(
+        recipe_ids, vectors, positions[found], get_thresholds(recipe_ids)
+    )
+    affected_ids = (
+        affected_ids | set(recipe_ids[affected].tolist())
+    ) - changed_ids
+    if affected_ids:
+        recipe_ids, vectors = get_recipe_vectors(
+            get_candidate_ids(affected_ids)
+        )
+        positions, found = get_positions(recipe_ids, sorted(affected_ids))
+        score_recipes(recipe_ids, vectors, positions[found])
+    return found.sum() + len(affected_ids)
+
+
+def rebuild_neighbours():
+    Recipe.objects.filter(neighbours_stale=True).update(
+        neighbours_stale=False
+    )
+    return update_neighbours()
+
+
+def refresh_stale_neighbours():
+    recipe_ids = list(Recipe.objects.filter(
+        neighbours_stale=True
+    ).values_list('id', flat=True))
+    if not recipe_ids:
+        return 0
+    Recipe.objects.filter(id__in=recipe_ids).update(neighbours_stale=False)
+    try:
+        return update_neighbours(recipe_ids)
+    except Exception:
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            neighbours_stale=True
+        )
+        raise
@@ -0,0 +1,22 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from users.models import User
+from .models import Recipe
+
+
+def update_author_stats(author_ids):
+    recipes = Recipe.objects.filter(
+        author=models.OuterRef('pk')
+    ).order_by().values('author')
+    User.objects.filter(id__in=author_ids).update(
+        recipes_count=Coalesce(
+            models.Subquery(recipes.annotate(
+                count=models.Count('id')
+            ).values('count')),
+            0
+        ),
+        last_recipe_at=models.Subquery(recipes.annotate(
+            last=models.Max('pub_date')
+        ).values('last'))
+    )
@@ -0,0 +1,24 @@
+import os
+import posixpath
+from hashlib import sha256
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        name = posixpath.join(
+            posixpath.dirname(name),
+            digest.hexdigest() + posixpath.splitext(name)[1].lower()
+        )
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+
+image_storage = ContentAddressedStorage()
@@ -0,0 +1,63 @@
+from backend.constants import (
+    DELETION_CHUNK_SIZE, INGREDIENT_INDEX_COMPACT_DELAY, SIMILAR_REFRESH_DELAY
+)
+from jobs.models import Job
+from jobs.queue import on_commit_once, task
+from users.models import User
+from .deletion import delete_user
+from .ingredient_index import compact_index, record_index_changes
+from .shopping_list import save_shopping_list
+from .similarity import refresh_stale_neighbours
+
+
+@task
+def build_shopping_list(user_id):
+    return {'file': save_shopping_list(user_id)}
+
+
+@task
+def delete_user_data(user_id):
+    user = User.objects.filter(id=user_id).first()
+    if user is not None:
+        delete_user(user)
+
+
+def schedule_user_deletion(user):
+    if user.recipes.count() <= DELETION_CHUNK_SIZE:
+        delete_user(user)
+        return None
+    user.is_active = False
+    user.save(update_fields=('is_active',))
+    return delete_user_data.enqueue(user.id)
+
+
+@task
+def refresh_recipe_neighbours():
+    return {'recipes': refresh_stale_neighbours()}
+
+
+def schedule_neighbours_refresh():
+    if not Job.objects.filter(
+        name=refresh_recipe_neighbours.name, status=Job.QUEUED
+    ).exists():
+        refresh_recipe_neighbours.enqueue(countdown=SIMILAR_REFRESH_DELAY)
+
+
+@task
+def compact_ingredient_index():
+    return {'changes': compact_index()}
+
+
+def schedule_index_compaction():
+    if not Job.objects.filter(
+        name=compact_ingredient_index.name, status=Job.QUEUED
+    ).exists():
+        compact_ingredient_index.enqueue(
+            countdown=INGREDIENT_INDEX_COMPACT_DELAY
+        )
+
+
+def update_ingredient_index(pairs):
+    if pairs:
+        record_index_changes(pairs)
+        on_commit_once(schedule_index_compaction)
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.3 on 2026-10-19 03:40
+
+from django.db import migrations, models
+
+
+def assign_bits(apps, schema_editor):
+    Tag = apps.get_model('tags', 'Tag')
+    for bit, tag in enumerate(Tag.objects.order_by('id')):
+        tag.bit = bit
+        tag.save(update_fields=('bit',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0002_auto_20240118_2025'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='бит в маске тегов рецепта'),
+        ),
+        migrations.RunPython(assign_bits, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, unique=True, verbose_name='бит в маске тегов рецепта'),
+        ),
+    ]
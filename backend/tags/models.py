@@ -1,7 +1,8 @@
 from colorfield.fields import ColorField
+from django.core.exceptions import ValidationError
 from django.db import models
 
-from backend.constants import MAX_FIELD_LENGTH
+from backend.constants import MAX_FIELD_LENGTH, MAX_TAGS
 
 
 class Tag(models.Model):
@@ -20,6 +21,11 @@ class Tag(models.Model):
         unique=True,
         verbose_name='слаг'
     )
+    bit = models.PositiveSmallIntegerField(
+        unique=True,
+        editable=False,
+        verbose_name='бит в маске тегов рецепта'
+    )
 
     class Meta:
         ordering = ('name',)
@@ -28,3 +34,23 @@ class Tag(models.Model):
 
     def __str__(self):
         return self.name
+
+    @property
+    def mask(self):
+        return 1 << self.bit
+
+    def get_free_bit(self):
+        used_bits = set(Tag.objects.values_list('bit', flat=True))
+        for bit in range(MAX_TAGS):
+            if bit not in used_bits:
+                return bit
+        raise ValidationError(f'Нельзя создать больше {MAX_TAGS} тегов.')
+
+    def clean(self):
+        if self.bit is None:
+            self.get_free_bit()
+
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            self.bit = self.get_free_bit()
+        super().save(*args, **kwargs)
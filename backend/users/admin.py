@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from recipes.tasks import schedule_user_deletion
 from .models import User, Subscription
 
 
@@ -11,8 +12,22 @@ class UserAdmin(UserAdmin):
         'is_staff', 'is_active', 'last_login', 'date_joined'
     )
     search_fields = ('username', 'email', 'first_name', 'last_name')
-    list_filter = ('username', 'email', 'is_staff', 'is_active')
+    list_filter = ('is_staff', 'is_active')
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def delete_model(self, request, obj):
+        schedule_user_deletion(obj)
 
-admin.site.register(Subscription)
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            schedule_user_deletion(user)
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'subscription')
+    list_select_related = ('user', 'subscription')
+    raw_id_fields = ('user', 'subscription')
+    ordering = ('-id',)
+    show_full_result_count = False
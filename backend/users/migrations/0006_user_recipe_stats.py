@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_recipe_stats(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = Recipe.objects.filter(
+        author=models.OuterRef('pk')
+    ).order_by().values('author')
+    User.objects.update(
+        recipes_count=Coalesce(
+            models.Subquery(recipes.annotate(
+                count=models.Count('id')
+            ).values('count')),
+            0
+        ),
+        last_recipe_at=models.Subquery(recipes.annotate(
+            last=models.Max('pub_date')
+        ).values('last'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_user_username'),
+        ('recipes', '0012_imageupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_recipe_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='дата последнего рецепта'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='количество рецептов'),
+        ),
+        migrations.RunPython(fill_recipe_stats, migrations.RunPython.noop),
+    ]
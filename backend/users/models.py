@@ -4,6 +4,9 @@ from django.db import models
 
 from backend.constants import MAX_USERNAME_LENGTH
 
+RECIPE_STATS_FIELDS = ('recipes_count', 'last_recipe_at')
+AUTH_FIELDS = ('password', 'is_active')
+
 
 class User(AbstractUser):
 
@@ -28,6 +31,17 @@ class User(AbstractUser):
         max_length=MAX_USERNAME_LENGTH,
         verbose_name='фамилия'
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='количество рецептов'
+    )
+    last_recipe_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='дата последнего рецепта'
+    )
 
     class Meta:
         ordering = ('-date_joined',)
@@ -37,6 +51,18 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        if update_fields is None and not (
+            force_insert or self._state.adding
+        ):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RECIPE_STATS_FIELDS
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
 
 class Subscription(models.Model):
     user = models.ForeignKey(
@@ -68,4 +94,4 @@ class Subscription(models.Model):
         verbose_name_plural = 'Подписки'
 
     def __str__(self):
-        return self.subscription
+        return self.subscription.username